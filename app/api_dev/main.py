@@ -6,16 +6,78 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 sys.path.append(project_root)
 
 from src.model import TastyModel
-from fastapi import FastAPI, HTTPException, Request
+from src.monitoring import DriftMonitor, SampledProfiler, ProfilingMiddleware
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from app.api_dev.schemas import PredictionInput, PredictionOutput
+from fastapi.responses import JSONResponse
+from app.api_dev.schemas import PredictionInput, PredictionOutput, ExplanationOutput
+from contextlib import asynccontextmanager
 from decimal import Decimal
+from itertools import count
+import asyncio
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the warm-up in a background thread while the worker starts serving, and fold the drift buffer periodically.
+
+    The worker answers /health immediately, while /ready returns 503 until the warm-up completes.
+    """
+
+    warmup_stop.clear()
+    warmup = asyncio.create_task(asyncio.to_thread(warm_up))
+    drift_flusher = asyncio.create_task(flush_drift_periodically())
+
+    yield
+
+    drift_flusher.cancel()
+
+    # Stop retrying a failed warm-up, and let a running attempt finish; its thread cannot be interrupted.
+    warmup_stop.set()
+    await asyncio.gather(warmup, drift_flusher, return_exceptions=True)
+
 
 # Instantiate the FastAPI application.
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 FRONTEND_ORIGIN = os.getenv("FRONTEND_ORIGIN", "http://localhost:3000")
 
+# Number of warm-up rounds, and the batch sizes predicted in each round, run before the worker reports ready.
+WARMUP_ITERATIONS = int(os.getenv("WARMUP_ITERATIONS", "3"))
+WARMUP_BATCH_SIZES = [int(size) for size in os.getenv("WARMUP_BATCH_SIZES", "1,16,64").split(",")]
+
+# Delay before retrying a failed warm-up, doubled after every failure up to the maximum.
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "1.0"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "60.0"))
+
+# Readiness of the worker, set once the warm-up completes, and the signal stopping warm-up retries on shutdown.
+readiness = {"ready": False, "warmup_seconds": None, "error": None, "attempts": 0}
+warmup_stop = threading.Event()
+
+# Construct the absolute paths to the trained model and to the data it was trained on.
+MODEL_PATH = os.path.join(project_root, "models", "tasty_model1.joblib")
+REFERENCE_DATA_PATH = os.path.join(project_root, "data", "cleaned_data.csv")
+
+# Drift monitor for the served traffic, created on first use.
+drift_monitor = None
+
+# Requests only append to the drift buffer; a background task folds it into the sketches every DRIFT_FLUSH_SECONDS.
+# A request folds it itself only if DRIFT_BUFFER_SIZE observations pile up in between.
+DRIFT_FLUSH_SECONDS = float(os.getenv("DRIFT_FLUSH_SECONDS", "1.0"))
+DRIFT_BUFFER_SIZE = int(os.getenv("DRIFT_BUFFER_SIZE", "65536"))
+
+
+# Trained model, loaded (with its precomputed explainer) during warm-up or on first use.
+tasty_model = None
+
+# Guards the lazy creation of the model and drift monitor, which warm-up and requests may race on.
+load_lock = threading.Lock()
+
 # Add CORS middleware.
 app.add_middleware(
     CORSMiddleware, 
@@ -26,9 +88,24 @@ app.add_middleware(
 )
 
 
+# Opt-in request profiling: dump a cProfile .pstats file for 1 in every PROFILE_SAMPLE_RATE requests and, when
+# PROFILE_HEADER_ENABLED is set, for every request sent with the "X-Profile: true" header. Only the
+# PROFILE_MAX_DUMPS most recent files are kept. With both disabled (the default) the middleware is not registered.
+# Every endpoint is async so its handler runs, and is profiled, on the event loop thread.
+request_profiler = SampledProfiler(
+    sample_rate=int(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    output_dir=os.getenv("PROFILE_DIR", os.path.join(project_root, "profiles")),
+    allow_requested=os.getenv("PROFILE_HEADER_ENABLED", "").lower() in ("1", "true"),
+    max_dumps=int(os.getenv("PROFILE_MAX_DUMPS", "100"))
+)
+
+if request_profiler.sample_rate > 0 or request_profiler.allow_requested:
+    app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+
+
 # Define a GET endpoint for the health check.
 @app.get("/health")
-def health():
+async def health():
     """
     Health check endpoint to confirm the service is running.
 
@@ -38,6 +115,275 @@ def health():
     return {"status": "Service is running!"}
 
 
+def get_drift_monitor() -> DriftMonitor:
+    """
+    Return the drift monitor of the served traffic, creating it on first use.
+
+    The monitor is built from the loaded model's preprocessor and training baseline. Artifacts saved
+    without a baseline fall back to computing it from the training dataset.
+
+    Returns:
+        DriftMonitor: The monitor aligned with the model's preprocessor.
+    """
+
+    global drift_monitor
+
+    # Skip the lock once the monitor exists, as this runs on every prediction.
+    if drift_monitor is not None:
+        return drift_monitor
+
+    # Loading the model takes the lock itself, so it happens before.
+    model = get_tasty_model()
+
+    with load_lock:
+        if drift_monitor is None:
+            monitor = DriftMonitor.from_preprocessor(model.preprocessor, baseline=model.baseline,
+                                                     buffer_size=DRIFT_BUFFER_SIZE)
+
+            if model.baseline is None and os.path.exists(REFERENCE_DATA_PATH):
+                monitor.fit_baseline(pd.read_csv(REFERENCE_DATA_PATH))
+
+            # The monitor reads the feature values from the request bodies, so every feature must be a request field.
+            missing = [feature for feature in monitor.numerical_features + [monitor.categorical_feature]
+                       if feature not in PredictionInput.model_fields]
+            if missing:
+                raise ValueError(f"Drift monitor expects features {missing} missing from the request schema.")
+
+            drift_monitor = monitor
+
+    return drift_monitor
+
+
+async def record_drift(request: PredictionInput):
+    """
+    Create the drift monitor off the event loop, then record a served request with it.
+
+    Only used until the monitor exists; afterwards requests are observed directly. Monitoring failures
+    are printed, never raised, so they cannot fail the prediction.
+
+    Args:
+        request (PredictionInput): The request body of the prediction.
+
+    Returns:
+        None
+    """
+
+    try:
+        # Creating the monitor may load the model, so it runs off the event loop.
+        monitor = drift_monitor if drift_monitor is not None else await asyncio.to_thread(get_drift_monitor)
+
+        monitor.observe(request)
+
+    except Exception as e:
+        print(f"Drift monitoring failed: {e}")
+
+
+async def flush_drift_periodically():
+    """
+    Fold the buffered drift observations into the sketches every `DRIFT_FLUSH_SECONDS`, off the event loop.
+
+    Keeps the batch update off the prediction path, which then only pays for appending the request.
+
+    Returns:
+        None
+    """
+
+    while True:
+        await asyncio.sleep(DRIFT_FLUSH_SECONDS)
+
+        if drift_monitor is not None:
+            try:
+                await asyncio.to_thread(drift_monitor.flush)
+
+            except Exception as e:
+                print(f"Drift monitoring failed: {e}")
+
+
+def get_tasty_model() -> TastyModel:
+    """
+    Return the trained Tasty Model, loading it on first use.
+
+    Loading the model also precomputes its explainer, so it is only done once per worker. A failed
+    load is not cached, so the next call retries it.
+
+    Returns:
+        TastyModel: The loaded model.
+
+    Raises:
+        RuntimeError: If the model artifact cannot be loaded.
+    """
+
+    global tasty_model
+
+    # Skip the lock once the model is loaded, as this runs on every prediction.
+    if tasty_model is not None:
+        return tasty_model
+
+    with load_lock:
+        if tasty_model is None:
+            model = TastyModel()
+            model.load_model(filename=MODEL_PATH)
+
+            # load_model prints its errors instead of raising them.
+            if model.model is None or model.preprocessor is None:
+                raise RuntimeError(f"Model could not be loaded from {MODEL_PATH}.")
+
+            # Artifacts saved without an explanation reference use the training dataset's average recipe.
+            if model.reference is None and os.path.exists(REFERENCE_DATA_PATH):
+                model.set_reference(pd.read_csv(REFERENCE_DATA_PATH))
+
+            tasty_model = model
+
+    return tasty_model
+
+
+async def loaded_model() -> TastyModel:
+    """
+    Return the trained Tasty Model from an endpoint, without blocking the event loop.
+
+    Returns:
+        TastyModel: The loaded model, loaded in a worker thread if the warm-up has not loaded it yet.
+    """
+
+    return tasty_model if tasty_model is not None else await asyncio.to_thread(get_tasty_model)
+
+
+def prime_model():
+    """
+    Load the model and drift monitor and prime the prediction code paths, once.
+
+    This function performs the following steps:
+    1. Loads the model (precomputing its explainer) and creates the drift monitor.
+    2. For `WARMUP_ITERATIONS` rounds, predicts a synthetic recipe of every known category through
+       `predict_traffic_increase`, then predicts and explains synthetic batches of every `WARMUP_BATCH_SIZES` size.
+
+    Synthetic recipes are drawn uniformly within the fitted scaler range, and are not recorded by the drift monitor.
+
+    Returns:
+        None
+
+    Raises:
+        Exception: Any error raised while loading or predicting.
+    """
+
+    model = get_tasty_model()
+    get_drift_monitor()
+
+    scaler = model.preprocessor.named_transformers_['num']
+    encoder = model.preprocessor.named_transformers_['cat']
+    columns = {name: list(columns) for name, _, columns in model.preprocessor.transformers_}
+    categories = list(encoder.categories_[0])
+
+    rng = np.random.default_rng(42)
+
+    def synthetic_recipes(n_rows: int) -> pd.DataFrame:
+        recipes = pd.DataFrame(rng.uniform(scaler.data_min_, scaler.data_max_, size=(n_rows, len(columns['num']))),
+                               columns=columns['num'])
+        recipes[columns['cat'][0]] = np.resize(categories, n_rows)
+
+        # Integer fields of the request schema (servings) keep their integer dtype.
+        for feature, field in PredictionInput.model_fields.items():
+            if field.annotation is int:
+                recipes[feature] = recipes[feature].round().astype(int)
+
+        return recipes
+
+    for _ in range(WARMUP_ITERATIONS):
+        for recipe in synthetic_recipes(len(categories)).to_dict(orient="records"):
+            model.predict_traffic_increase(**recipe)
+
+        for batch_size in WARMUP_BATCH_SIZES:
+            batch = synthetic_recipes(batch_size)
+            model.model.predict_proba(model.preprocessor.transform(batch))
+
+            if model.explainer is not None:
+                model.explain_traffic(batch)
+
+
+def warm_up():
+    """
+    Warm up the worker before serving, retrying failed attempts with exponential backoff.
+
+    Each attempt runs `prime_model`. A failed attempt is reported by /ready with its error, then retried after
+    `WARMUP_RETRY_SECONDS`, doubling up to `WARMUP_RETRY_MAX_SECONDS`, so a transient failure (e.g. the model
+    file not mounted yet) does not keep the worker out of rotation for its whole life. Retries stop when the
+    worker shuts down. On success, marks the worker ready and records the duration of the successful attempt.
+
+    Returns:
+        None
+    """
+
+    delay = WARMUP_RETRY_SECONDS
+
+    for attempt in count(1):
+        start = time.perf_counter()
+
+        try:
+            prime_model()
+            break
+
+        except Exception as e:
+            readiness["error"] = str(e)
+            readiness["attempts"] = attempt
+            print(f"Warm-up failed (attempt {attempt}), retrying in {delay:g}s: {e}")
+
+        # Wait for the next attempt, unless the worker shuts down meanwhile.
+        if warmup_stop.wait(delay):
+            return
+
+        delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+    readiness["warmup_seconds"] = time.perf_counter() - start
+    readiness["error"] = None
+    readiness["ready"] = True
+    print(f"Warm-up completed in {readiness['warmup_seconds']:.2f}s")
+
+
+# Define a GET endpoint for the readiness check.
+@app.get("/ready")
+async def ready():
+    """
+    Readiness endpoint, for load balancers to route traffic only to warmed-up workers.
+
+    Returns:
+        dict: {"status": "ready", "warmupSeconds": <duration>} once the warm-up completed,
+            else a 503 response with {"status": "warming up"} (or "warm-up failed" with the error and the
+            number of failed attempts, while the warm-up is retried).
+    """
+
+    if readiness["ready"]:
+        return {"status": "ready", "warmupSeconds": readiness["warmup_seconds"]}
+
+    if readiness["error"] is not None:
+        return JSONResponse(status_code=503, content={"status": "warm-up failed", "detail": readiness["error"],
+                                                      "attempts": readiness.get("attempts")})
+
+    return JSONResponse(status_code=503, content={"status": "warming up"})
+
+
+# Define a GET endpoint for the feature drift report.
+@app.get("/drift")
+async def drift():
+    """
+    Feature drift endpoint comparing the served traffic with the training baseline.
+
+    Returns:
+        dict: The number of observations and unknown categories seen, and the PSI/KS statistics per feature.
+
+    Raises:
+        HTTPException: If the drift monitor cannot be created.
+    """
+
+    try:
+        # Creating the monitor loads the model artifact, so it runs off the event loop.
+        monitor = drift_monitor if drift_monitor is not None else await asyncio.to_thread(get_drift_monitor)
+
+        return monitor.report()
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # Define a POST endpoint for predicting recipe traffic based on user information.
 @app.post("/recipe_type")
 async def recipe_type(request: PredictionInput) -> PredictionOutput:
@@ -70,32 +416,32 @@ async def recipe_type(request: PredictionInput) -> PredictionOutput:
         category = request.category
         servings = request.servings
 
-        # Construct the absolute path to the "models" directory.
-        model_path = os.path.join(project_root, "models", "tasty_model1.joblib")
-
-        # Initialize the trained Tasty Model.
-        model = TastyModel()
-
         try:
-            # Load the model.
-            model.load_model(filename=model_path)
-            print("Model loaded successfully!")
+            # Generate recipe traffic prediction and probability with the model loaded at start-up.
+            model = await loaded_model()
+            traffic_category, prediction_probability = model.predict_traffic_increase(
+                calories=calories,
+                carbohydrate=carbohydrate,
+                sugar=sugar,
+                protein=protein,
+                category=category,
+                servings=servings,
+            )
 
-        except FileNotFoundError:
-            print("Model file not found. Check the file path.")
+        finally:
+            # Record the request for drift monitoring, including requests with unknown categories that the
+            # model rejects. The request body is buffered as is, so this is a single append; the background
+            # flusher reads its fields later.
+            if drift_monitor is not None:
+                try:
+                    drift_monitor.observe(request)
 
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-        # Generate recipe traffic prediction and probability.
-        traffic_category, prediction_probability = model.predict_traffic_increase(
-            calories=calories,
-            carbohydrate=carbohydrate,
-            sugar=sugar,
-            protein=protein,
-            category=category,
-            servings=servings,
-        )
+                except Exception as e:
+                    print(f"Drift monitoring failed: {e}")
+
+            # Without a loaded model the monitor cannot be built, and building it would retry the failed load.
+            elif tasty_model is not None:
+                await record_drift(request)
 
         #
         probability = float(Decimal(prediction_probability).quantize(Decimal("0.01")))
@@ -109,6 +455,56 @@ async def recipe_type(request: PredictionInput) -> PredictionOutput:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Define a POST endpoint for explaining recipe traffic predictions.
+@app.post("/recipe_type/explain")
+async def recipe_type_explain(request: PredictionInput) -> ExplanationOutput:
+    """
+    Endpoint to explain why a recipe is predicted to result in high or low traffic.
+
+    Args:
+        request (PredictionInput): The request body containing details about the recipe, including:
+            - Calories (float): The number of calories in the recipe.
+            - Carbohydrate (float): The amount of carbohydrates (in grams).
+            - Sugar (float): The sugar content (in grams).
+            - Protein (float): The protein content (in grams).
+            - Category (str): The category of the recipe.
+            - Servings (int): The number of servings the recipe provides.
+
+    Returns:
+        ExplanationOutput: prediction, trafficProbability, baseValue and the per-field contributions
+            to the probability of high traffic.
+
+    Raises:
+        HTTPException: If an error occurs during the explanation process.
+    """
+
+    try:
+
+        # Explain the recipe as a batch of one.
+        model = await loaded_model()
+        explanation = model.explain_traffic(pd.DataFrame([request.model_dump()]))
+        high_traffic_probability = explanation["probabilities"][0]
+
+        # Categorize the traffic impact, as predict_traffic_increase does.
+        if high_traffic_probability > 0.5:
+            traffic_category, prediction_probability = "High Traffic", high_traffic_probability
+
+        else:
+            traffic_category, prediction_probability = "Low Traffic", 1 - high_traffic_probability
+
+        probability = float(Decimal(prediction_probability).quantize(Decimal("0.01")))
+
+        return ExplanationOutput(
+            prediction=traffic_category,
+            trafficProbability=probability,
+            baseValue=explanation["base_value"],
+            contributions=explanation["contributions"][0],
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+from typing import Dict
 from pydantic import BaseModel, Field
 
 
@@ -38,3 +39,25 @@ class PredictionOutput(BaseModel):
 
     prediction: str = Field(..., description="Predicted traffic class, e.g. 'High Traffic' or 'Low Traffic'")
     trafficProbability: float = Field(..., ge=0.0, le=1.0, description="Probability of the predicted class (0-1)")
+
+
+
+
+class ExplanationOutput(BaseModel):
+    """
+    Defines the response schema for the recipe traffic explanation endpoint.
+
+    Attributes:
+        prediction: Predicted traffic class (e.g. 'High Traffic' or 'Low Traffic').
+        trafficProbability: Probability of the predicted class, between 0 and 1.
+        baseValue: Probability of high traffic for an average training recipe.
+        contributions: Contribution of each input field to the probability of high traffic.
+
+    Note:
+        baseValue plus the sum of contributions equals the probability of high traffic.
+    """
+
+    prediction: str = Field(..., description="Predicted traffic class, e.g. 'High Traffic' or 'Low Traffic'")
+    trafficProbability: float = Field(..., ge=0.0, le=1.0, description="Probability of the predicted class (0-1)")
+    baseValue: float = Field(..., description="Probability of high traffic for an average training recipe (0-1)")
+    contributions: Dict[str, float] = Field(..., description="Per input field contribution to the probability of high traffic")
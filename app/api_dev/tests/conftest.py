@@ -1,6 +1,7 @@
 """
 shared pytest configuration for api tests.
-ensures the project root is on sys.path and exposes a fastapi TestClient.
+ensures the project root is on sys.path and exposes a fastapi TestClient, the recipe dataset
+and a small trained random forest.
 """
 
 import sys
@@ -13,9 +14,16 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 
+import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
 from app.api_dev.main import app  # noqa: E402
+from src.model import TastyModel  # noqa: E402
+
+
+# compute the path of the recipe dataset at the repository root.
+DATA_PATH = project_root / "data" / "cleaned_data.csv"
 
 
 # expose a TestClient fixture for testing the fastapi app.
@@ -25,3 +33,23 @@ def client() -> TestClient:
     
     return TestClient(app)
 
+
+
+# expose the recipe dataset, shared by all tests: do not modify it in place.
+@pytest.fixture(scope="session")
+def recipe_data() -> pd.DataFrame:
+    """the cleaned recipe dataset."""
+
+    return pd.read_csv(DATA_PATH)
+
+
+
+# expose a small random forest trained once for the whole session: do not refit or modify it.
+@pytest.fixture(scope="session")
+def trained_forest(recipe_data: pd.DataFrame) -> TastyModel:
+    """small random forest TastyModel trained through TastyModel.train on the recipe dataset."""
+
+    model = TastyModel(model=RandomForestClassifier(n_estimators=20, max_depth=5, random_state=42))
+    model.train(recipe_data, cols_to_drop=["recipe", "traffic_level"], target_column="traffic_level")
+
+    return model
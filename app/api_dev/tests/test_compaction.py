@@ -0,0 +1,120 @@
+from pathlib import Path
+import copy
+import numpy as np
+import pandas as pd
+from sklearn.ensemble._forest import _generate_sample_indices, _get_n_samples_bootstrap
+from src.model import TastyModel
+from src.model import compaction
+from src.model.compaction import compact_model, select_tree_subset
+
+
+def test_select_tree_subset_only_scores_out_of_bag_rows(trained_forest: TastyModel) -> None:
+    """every tree is evaluated on, and only on, the training rows missing from its bootstrap sample."""
+
+    X_train, y_train = trained_forest.X_train, trained_forest.y_train
+    n_samples = X_train.shape[0]
+    n_samples_bootstrap = _get_n_samples_bootstrap(n_samples, trained_forest.model.max_samples)
+
+    # record the rows every tree is asked to predict, on a copy so the shared forest stays untouched.
+    forest = copy.copy(trained_forest.model)
+    forest.estimators_ = [copy.deepcopy(estimator) for estimator in forest.estimators_]
+    evaluated = []
+
+    for estimator in forest.estimators_:
+        def recording_predict_proba(X, estimator=estimator, predict_proba=estimator.predict_proba):
+            evaluated.append((estimator, X))
+            return predict_proba(X)
+
+        estimator.predict_proba = recording_predict_proba
+
+    subsets = list(select_tree_subset(forest, X_train, y_train, f1_tolerance=0.05, accuracy_tolerance=0.05))
+
+    # verify each tree is evaluated once, on exactly as many rows as it left out of its bootstrap sample.
+    assert len(evaluated) == len(forest.estimators_)
+
+    for estimator, X in evaluated:
+        in_bag = np.unique(_generate_sample_indices(estimator.random_state, n_samples, n_samples_bootstrap))
+
+        assert X.shape[0] == n_samples - len(in_bag)
+
+    # verify the probability matrix is missing exactly at the in-bag rows of every tree.
+    probabilities = compaction._oob_probabilities(forest, X_train)
+
+    for index, estimator in enumerate(forest.estimators_):
+        in_bag = np.unique(_generate_sample_indices(estimator.random_state, n_samples, n_samples_bootstrap))
+
+        assert np.flatnonzero(np.isnan(probabilities[index])).tolist() == in_bag.tolist()
+
+    # verify the yielded subsets grow along one greedy path and never contain the whole forest.
+    assert all(later[:len(earlier)] == earlier for earlier, later in zip(subsets, subsets[1:]))
+
+    assert all(len(subset) < len(forest.estimators_) for subset in subsets)
+
+
+
+def test_compact_model_stays_within_both_tolerances(trained_forest: TastyModel) -> None:
+    """the accepted candidate is smaller and within the F1 and accuracy tolerances on the held-out split."""
+
+    compact, report = compact_model(trained_forest, f1_tolerance=0.02, accuracy_tolerance=0.02)
+
+    # verify a candidate is accepted and is cheaper than the forest.
+    assert report["method"] in ("tree_subset", "distillation")
+
+    assert report["compact"]["n_nodes"] < report["original"]["n_nodes"]
+
+    # verify the held-out quality stays within both tolerances.
+    assert report["compact"]["test_f1_score"] >= report["original"]["test_f1_score"] - 0.02
+
+    assert report["compact"]["test_accuracy"] >= report["original"]["test_accuracy"] - 0.02
+
+    # verify the original forest keeps all of its trees.
+    assert len(trained_forest.model.estimators_) == trained_forest.model.n_estimators
+
+
+
+def test_compact_model_artifact_loads_and_predicts(trained_forest: TastyModel, recipe_data: pd.DataFrame, tmp_path: Path) -> None:
+    """the saved compact artifact loads into a TastyModel and predicts like the compact model."""
+
+    compact, report = compact_model(trained_forest, f1_tolerance=0.02, accuracy_tolerance=0.02,
+                                    filename=tmp_path / "compact.joblib")
+
+    # verify the artifact is written and reported.
+    assert report["saved"] == str(tmp_path / "compact.joblib")
+
+    loaded_model = TastyModel()
+    loaded_model.load_model(tmp_path / "compact.joblib")
+
+    # verify the loaded model predicts the held-out split like the compact model.
+    assert np.array_equal(loaded_model.model.predict(trained_forest.X_test), compact.model.predict(trained_forest.X_test))
+
+    # verify a raw recipe goes through the full prediction path.
+    recipe = recipe_data.iloc[0]
+    traffic_category, probability = loaded_model.predict_traffic_increase(
+        calories=recipe["calories"], carbohydrate=recipe["carbohydrate"], sugar=recipe["sugar"],
+        protein=recipe["protein"], category=recipe["category"], servings=recipe["servings"],
+    )
+
+    assert traffic_category in ("High Traffic", "Low Traffic")
+
+    assert 0.5 <= probability <= 1
+
+
+
+def test_compact_model_without_accepted_candidate_saves_nothing(trained_forest: TastyModel, tmp_path: Path) -> None:
+    """when no candidate is within tolerance, the original model is kept and no artifact is written."""
+
+    # a negative tolerance asks every candidate to beat the forest by a full point, which none can.
+    compact, report = compact_model(trained_forest, f1_tolerance=-1.0, accuracy_tolerance=-1.0,
+                                    filename=tmp_path / "compact.joblib")
+
+    # verify the report says nothing was compacted or saved.
+    assert report["method"] is None
+
+    assert report["compact"] is None
+
+    assert report["saved"] is None
+
+    assert not (tmp_path / "compact.joblib").exists()
+
+    # verify the original forest is returned.
+    assert compact.model is trained_forest.model
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from src.monitoring import DriftMonitor
+from src.monitoring.drift import binned_ks_statistic, population_stability_index
+
+
+@pytest.fixture
+def monitor() -> DriftMonitor:
+    """drift monitor over two numerical features scaled on [0, 10] and [100, 200], with 5 bins each."""
+
+    return DriftMonitor(
+        numerical_features=["calories", "sugar"],
+        feature_min=[0.0, 100.0],
+        feature_max=[10.0, 200.0],
+        categorical_feature="category",
+        categories=["Dessert", "Soup"],
+        n_bins=5,
+        buffer_size=4,
+    )
+
+
+def recipe(calories: float, sugar: float = 150.0, category: str = "Dessert") -> SimpleNamespace:
+    """observation exposing the monitored features as attributes, like a request body."""
+
+    return SimpleNamespace(calories=calories, sugar=sugar, category=category)
+
+
+
+def test_population_stability_index() -> None:
+    """psi is zero for identical distributions and matches the closed form otherwise."""
+
+    # verify identical proportions give no drift, whatever the sample sizes.
+    assert population_stability_index(np.array([10, 30, 60]), np.array([1, 3, 6])) == pytest.approx(0.0)
+
+    # verify the closed form sum((actual - expected) * ln(actual / expected)).
+    expected = 0.4 * np.log(0.9 / 0.5) + (-0.4) * np.log(0.1 / 0.5)
+
+    assert population_stability_index(np.array([50, 50]), np.array([90, 10])) == pytest.approx(expected)
+
+    # verify an empty bin gives a finite, significant value instead of infinity.
+    psi = population_stability_index(np.array([50, 50]), np.array([100, 0]))
+
+    assert np.isfinite(psi) and psi > 0.25
+
+
+
+def test_binned_ks_statistic() -> None:
+    """ks is the largest gap between the cumulative distributions at the bin edges."""
+
+    assert binned_ks_statistic(np.array([2, 2]), np.array([4, 4])) == pytest.approx(0.0)
+
+    assert binned_ks_statistic(np.array([2, 2]), np.array([1, 3])) == pytest.approx(0.25)
+
+    assert binned_ks_statistic(np.array([1, 0]), np.array([0, 1])) == pytest.approx(1.0)
+
+
+
+def test_scaler_edges_map_to_regular_bins(monitor: DriftMonitor) -> None:
+    """values at the scaler minimum and maximum fall in the first and last regular bins, just outside in the overflow bins."""
+
+    monitor.update_batch(np.array([[0.0, 150.0], [10.0, 150.0], [-0.01, 150.0], [10.01, 150.0]]), ["Dessert"] * 4)
+
+    counts = monitor._numerical_counts[0]
+
+    # verify the minimum lands in bin 1 and the maximum in bin n_bins, not in the overflow bin.
+    assert counts.tolist() == [1, 1, 0, 0, 0, 1, 1]
+
+
+
+def test_infinite_and_missing_values(monitor: DriftMonitor) -> None:
+    """+inf overflows, -inf underflows and nan is counted as missing, outside the histogram."""
+
+    monitor.update_batch(np.array([[np.inf, np.nan], [-np.inf, 1e300], [np.nan, -1e300]]), ["Dessert"] * 3)
+
+    calories = monitor.report()["features"]["calories"]
+    sugar = monitor.report()["features"]["sugar"]
+
+    # verify infinities go to the matching outer bins and nan is only counted as missing.
+    assert (calories["underflow"], calories["overflow"], calories["missing"]) == (1, 1, 1)
+
+    assert monitor._numerical_counts[0].sum() == 2
+
+    # verify huge finite values do not wrap around in the integer bin index.
+    assert (sugar["underflow"], sugar["overflow"], sugar["missing"]) == (1, 1, 1)
+
+
+
+def test_concurrent_observe_flush_and_report(monitor: DriftMonitor) -> None:
+    """observations from concurrent threads are each counted exactly once while reports drain the buffer."""
+
+    monitor.fit_baseline(pd.DataFrame({"calories": [5.0], "sugar": [150.0], "category": ["Dessert"]}))
+    n_threads, n_observations = 8, 500
+    errors = []
+
+    def serve():
+        try:
+            for index in range(n_observations):
+                monitor.observe(recipe(float(index % 10), category="Soup" if index % 2 else "Dessert"))
+
+                if index % 50 == 0:
+                    monitor.report()
+
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=serve) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    report = monitor.report()
+
+    # verify no flush raised and every observation is counted once.
+    assert errors == []
+
+    assert report["observations"] == n_threads * n_observations
+
+    assert report["features"]["category"]["counts"] == {"Dessert": n_threads * n_observations // 2,
+                                                        "Soup": n_threads * n_observations // 2}
+
+    assert monitor._numerical_counts[0].sum() == n_threads * n_observations
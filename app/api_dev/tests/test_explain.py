@@ -0,0 +1,63 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.model import TastyModel
+from src.model.explain import LinearExplainer, TreePathExplainer
+
+
+# compute the path of the shipped model at the repository root.
+MODEL_PATH = Path(__file__).resolve().parents[3] / "models" / "tasty_model1.joblib"
+FEATURES = ["calories", "carbohydrate", "sugar", "protein", "category", "servings"]
+
+
+def known_recipes(model: TastyModel, df: pd.DataFrame, n_rows: int = 50) -> pd.DataFrame:
+    """recipes of the dataset whose category is known to the model's encoder."""
+
+    categories = model.preprocessor.named_transformers_["cat"].categories_[0]
+
+    return df[df["category"].isin(categories)].head(n_rows)[FEATURES]
+
+
+def assert_additive(model: TastyModel, df: pd.DataFrame) -> None:
+    """base value plus the sum of contributions equals predict_proba of high traffic for every row."""
+
+    explanation = model.explainer.explain(df)
+    probabilities = model.model.predict_proba(model.preprocessor.transform(df))[:, 1]
+
+    explained = [explanation["base_value"] + sum(contributions.values()) for contributions in explanation["contributions"]]
+
+    assert np.allclose(explained, probabilities, atol=1e-6)
+
+    assert all(set(contributions) == set(FEATURES) for contributions in explanation["contributions"])
+
+
+
+def test_tree_explainer_contributions_add_up_to_predict_proba(trained_forest: TastyModel, recipe_data: pd.DataFrame) -> None:
+    """a small random forest trained through TastyModel.train is explained exactly."""
+
+    # verify the forest gets the tree path explainer.
+    assert isinstance(trained_forest.explainer, TreePathExplainer)
+
+    assert_additive(trained_forest, known_recipes(trained_forest, recipe_data))
+
+
+
+def test_linear_explainer_of_shipped_model_adds_up_to_predict_proba(recipe_data: pd.DataFrame) -> None:
+    """the shipped logistic regression is explained exactly, around the average training recipe."""
+
+    model = TastyModel()
+    model.load_model(MODEL_PATH)
+
+    # the shipped artifact predates the stored reference, so it comes from the dataset.
+    assert model.reference is None
+
+    model.set_reference(recipe_data)
+
+    # verify the linear explainer uses a real reference instead of all zeros.
+    assert isinstance(model.explainer, LinearExplainer)
+
+    assert np.any(model.explainer.reference != 0)
+
+    assert 0 < model.explainer.base_value < 1
+
+    assert_additive(model, known_recipes(model, recipe_data))
@@ -0,0 +1,62 @@
+from pathlib import Path
+import pytest
+from src.model import TastyModel
+from src.model.importance import source_feature_groups, permutation_importance
+
+
+def test_source_feature_groups_aggregates_one_hot_columns(trained_forest: TastyModel) -> None:
+    """every numerical feature maps to one column and the category to all of its one-hot columns."""
+
+    groups = source_feature_groups(trained_forest.preprocessor)
+    categories = trained_forest.preprocessor.named_transformers_["cat"].categories_[0]
+
+    # verify the numerical features come first, one column each.
+    assert groups["calories"] == [0]
+
+    assert groups["servings"] == [4]
+
+    # verify the category spans one column per known category, after the numerical columns.
+    assert groups["category"] == list(range(5, 5 + len(categories)))
+
+    # verify the groups cover every preprocessed column exactly once.
+    assert sorted(column for columns in groups.values() for column in columns) == list(range(trained_forest.X_test.shape[1]))
+
+
+
+def test_permutation_importance_is_independent_of_n_jobs(trained_forest: TastyModel) -> None:
+    """serial and parallel permutation importance give the same result."""
+
+    groups = source_feature_groups(trained_forest.preprocessor)
+
+    # compute the permutation importance serially and with all cores.
+    serial = permutation_importance(trained_forest.model, trained_forest.X_test, trained_forest.y_test, groups, n_repeats=3, n_jobs=1)
+    parallel = permutation_importance(trained_forest.model, trained_forest.X_test, trained_forest.y_test, groups, n_repeats=3, n_jobs=-1)
+
+    # verify both runs give identical importances for every source feature.
+    assert serial == parallel
+
+    assert set(serial) == set(groups)
+
+
+
+def test_feature_importance_of_loaded_model_uses_impurity(trained_forest: TastyModel, tmp_path: Path) -> None:
+    """a loaded tree model without held-out split still reports aggregated impurity importances."""
+
+    # save the trained model and load it into a fresh TastyModel.
+    trained_forest.save_model(tmp_path / "model.joblib")
+    loaded_model = TastyModel()
+    loaded_model.load_model(tmp_path / "model.joblib")
+
+    report = loaded_model.feature_importance(output_dir=tmp_path)
+
+    # verify the permutation part is skipped and the impurity importances sum to one over the six features.
+    assert report["scoring"] is None
+
+    assert len(report["features"]) == 6
+
+    assert sum(values["impurity"] for values in report["features"].values()) == pytest.approx(1.0)
+
+    # verify the report files are written.
+    assert (tmp_path / "feature_importance.json").exists()
+
+    assert (tmp_path / "feature_importance.png").exists()
@@ -1,7 +1,9 @@
 from typing import Any, Dict
+import time
 import pytest
 from fastapi.testclient import TestClient
 from app.api_dev import main as main_module
+from src.monitoring import DriftMonitor
 
 
 @pytest.fixture
@@ -37,17 +39,11 @@ def test_recipe_type_success(monkeypatch: pytest.MonkeyPatch, client: TestClient
     """
     /recipe_type returns a valid PredictionOutput payload.
 
-    the TastyModel is monkeypatched so the test does not depend on a real model file.
+    the loaded model is monkeypatched so the test does not depend on a real model file.
     """
 
-    # define a fake model class to replace TastyModel during this test.
+    # define a fake model class to replace the loaded TastyModel during this test.
     class FakeModel:
-        def __init__(self) -> None:
-            self.loaded_path = None
-
-        def load_model(self, filename: str) -> None:
-            self.loaded_path = filename
-
         def predict_traffic_increase(
             self,
             *,
@@ -76,8 +72,8 @@ def test_recipe_type_success(monkeypatch: pytest.MonkeyPatch, client: TestClient
             return "High Traffic", 0.87
 
 
-    # patch TastyModel in the main module.
-    monkeypatch.setattr(main_module, "TastyModel", FakeModel)
+    # patch the loaded model in the main module.
+    monkeypatch.setattr(main_module, "tasty_model", FakeModel())
 
     # make a POST request to the /recipe_type endpoint with the sample payload.
     response = client.post("/recipe_type", json=sample_payload)
@@ -93,4 +89,273 @@ def test_recipe_type_success(monkeypatch: pytest.MonkeyPatch, client: TestClient
 
     assert isinstance(data["trafficProbability"], float)
 
-    assert 0.0 <= data["trafficProbability"] <= 1.0
\ No newline at end of file
+    assert 0.0 <= data["trafficProbability"] <= 1.0
+
+
+def test_drift_endpoint_reports_served_traffic(monkeypatch: pytest.MonkeyPatch, client: TestClient, sample_payload: Dict[str, Any]) -> None:
+    """/drift reports the observations recorded by /recipe_type against the training baseline."""
+
+    # define a fake model class so the prediction does not depend on the model file.
+    class FakeModel:
+        def predict_traffic_increase(self, **kwargs):
+            return "High Traffic", 0.87
+
+
+    # patch the loaded model in the main module and start from an empty drift monitor of the shipped model.
+    monkeypatch.setattr(main_module, "tasty_model", FakeModel())
+    monkeypatch.setattr(main_module, "drift_monitor", DriftMonitor.from_artifact(
+        main_module.MODEL_PATH, reference_data=main_module.REFERENCE_DATA_PATH))
+
+    # send one known and one unknown category through the prediction endpoint.
+    client.post("/recipe_type", json=sample_payload)
+    client.post("/recipe_type", json={**sample_payload, "category": "Soup"})
+
+    # make a GET request to the /drift endpoint.
+    response = client.get("/drift")
+
+    # verify the endpoint returns a 200 status code.
+    assert response.status_code == 200
+
+    # extract the data from the response.
+    data = response.json()
+
+    # verify both observations are counted, including the unknown category.
+    assert data["observations"] == 2
+
+    assert data["unknown_categories"] == 1
+
+    assert data["features"]["category"]["counts"]["Dessert"] == 1
+
+    # verify drift statistics are computed for every numerical feature.
+    for feature in ["calories", "carbohydrate", "sugar", "protein", "servings"]:
+        assert data["features"][feature]["psi"] >= 0.0
+
+        assert 0.0 <= data["features"][feature]["ks"] <= 1.0
+
+
+
+def test_recipe_type_explain_success(monkeypatch: pytest.MonkeyPatch, client: TestClient, sample_payload: Dict[str, Any]) -> None:
+    """
+    /recipe_type/explain returns a valid ExplanationOutput payload.
+
+    the loaded model is monkeypatched so the test does not depend on a real model file.
+    """
+
+    # define a fake model whose contributions add up to a low traffic probability.
+    class FakeModel:
+        def explain_traffic(self, df):
+
+            # verify that the model receives the request as a single row.
+            assert df.to_dict(orient="records") == [sample_payload]
+
+            return {
+                "base_value": 0.6,
+                "probabilities": [0.25],
+                "contributions": [{"calories": -0.05, "carbohydrate": 0.0, "sugar": -0.1,
+                                   "protein": 0.05, "category": -0.25, "servings": 0.0}],
+            }
+
+
+    # patch the loaded model in the main module.
+    monkeypatch.setattr(main_module, "tasty_model", FakeModel())
+
+    # make a POST request to the /recipe_type/explain endpoint with the sample payload.
+    response = client.post("/recipe_type/explain", json=sample_payload)
+
+    # verify the endpoint returns a 200 status code.
+    assert response.status_code == 200
+
+    # extract the data from the response.
+    data = response.json()
+
+    # verify the prediction is derived from the explained probability of high traffic.
+    assert data["prediction"] == "Low Traffic"
+
+    assert data["trafficProbability"] == 0.75
+
+    # verify the contributions cover every input field and add up to the probability of high traffic.
+    assert set(data["contributions"]) == set(sample_payload)
+
+    assert abs(data["baseValue"] + sum(data["contributions"].values()) - 0.25) < 1e-9
+
+
+
+def test_ready_endpoint_before_warm_up(monkeypatch: pytest.MonkeyPatch, client: TestClient) -> None:
+    """/ready returns 503 until the warm-up completes."""
+
+    # simulate a worker whose warm-up is still running.
+    monkeypatch.setattr(main_module, "readiness", {"ready": False, "warmup_seconds": None, "error": None, "attempts": 0})
+
+    # make a GET request to the /ready endpoint.
+    response = client.get("/ready")
+
+    # verify the endpoint reports the worker is not ready yet.
+    assert response.status_code == 503
+
+    assert response.json() == {"status": "warming up"}
+
+
+
+def test_ready_endpoint_after_warm_up(monkeypatch: pytest.MonkeyPatch, client: TestClient) -> None:
+    """/ready returns 200 and the warm-up duration once the warm-up completes."""
+
+    # simulate a worker whose warm-up completed.
+    monkeypatch.setattr(main_module, "readiness", {"ready": True, "warmup_seconds": 1.5, "error": None, "attempts": 0})
+
+    # make a GET request to the /ready endpoint.
+    response = client.get("/ready")
+
+    # verify the endpoint reports the worker is ready, with the warm-up duration.
+    assert response.status_code == 200
+
+    assert response.json() == {"status": "ready", "warmupSeconds": 1.5}
+
+
+
+def test_recipe_type_survives_drift_monitoring_failure(monkeypatch: pytest.MonkeyPatch, client: TestClient, sample_payload: Dict[str, Any]) -> None:
+    """/recipe_type still returns a prediction when the drift monitor cannot be created."""
+
+    # define a fake model class so the prediction does not depend on the model file.
+    class FakeModel:
+        def predict_traffic_increase(self, **kwargs):
+            return "Low Traffic", 0.6
+
+
+    def failing_drift_monitor():
+        raise RuntimeError("drift monitor unavailable")
+
+
+    # patch the loaded model and make the drift monitor creation fail.
+    monkeypatch.setattr(main_module, "tasty_model", FakeModel())
+    monkeypatch.setattr(main_module, "get_drift_monitor", failing_drift_monitor)
+
+    # make a POST request to the /recipe_type endpoint with the sample payload.
+    response = client.post("/recipe_type", json=sample_payload)
+
+    # verify the prediction is returned regardless of the monitoring failure.
+    assert response.status_code == 200
+
+    assert response.json()["prediction"] == "Low Traffic"
+
+
+
+def test_profile_header_is_ignored_by_default(monkeypatch: pytest.MonkeyPatch, client: TestClient, tmp_path) -> None:
+    """without PROFILE_HEADER_ENABLED, a request sent with the X-Profile header is not profiled."""
+
+    # write any profile to a temporary directory.
+    monkeypatch.setattr(main_module.request_profiler, "output_dir", tmp_path)
+
+    response = client.get("/health", headers={"X-Profile": "true"})
+
+    # verify the request is served without writing a profile.
+    assert response.status_code == 200
+
+    assert list(tmp_path.glob("*.pstats")) == []
+
+
+
+def poll_ready(client: TestClient, timeout: float = 30.0):
+    """poll /ready until the warm-up finishes (successfully or not) or the timeout expires."""
+
+    deadline = time.monotonic() + timeout
+    response = client.get("/ready")
+
+    while response.json()["status"] == "warming up" and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = client.get("/ready")
+
+    return response
+
+
+
+def test_lifespan_warm_up_loads_shipped_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    """starting the app warms up the shipped model and drift monitor, then reports ready."""
+
+    # start from an unloaded worker.
+    monkeypatch.setattr(main_module, "tasty_model", None)
+    monkeypatch.setattr(main_module, "drift_monitor", None)
+    monkeypatch.setattr(main_module, "readiness", {"ready": False, "warmup_seconds": None, "error": None, "attempts": 0})
+
+    # entering the client runs the lifespan, which starts the warm-up.
+    with TestClient(main_module.app) as lifespan_client:
+        response = poll_ready(lifespan_client)
+
+        # verify the worker reports ready with the warm-up duration.
+        assert response.status_code == 200
+
+        assert response.json()["status"] == "ready"
+
+        assert response.json()["warmupSeconds"] > 0
+
+        # verify the model and the drift monitor built from it are loaded.
+        assert main_module.tasty_model is not None
+
+        assert main_module.drift_monitor.numerical_features == ["calories", "carbohydrate", "sugar", "protein", "servings"]
+
+
+
+def test_lifespan_warm_up_failure_is_reported_and_retried(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    """a failing model load makes /ready return 503, is not cached, and is retried until the model appears."""
+
+    shipped_model_path = main_module.MODEL_PATH
+
+    # start from an unloaded worker whose model file does not exist yet, retrying quickly.
+    monkeypatch.setattr(main_module, "tasty_model", None)
+    monkeypatch.setattr(main_module, "drift_monitor", None)
+    monkeypatch.setattr(main_module, "readiness", {"ready": False, "warmup_seconds": None, "error": None, "attempts": 0})
+    monkeypatch.setattr(main_module, "MODEL_PATH", str(tmp_path / "missing.joblib"))
+    monkeypatch.setattr(main_module, "WARMUP_RETRY_SECONDS", 0.05)
+    monkeypatch.setattr(main_module, "WARMUP_RETRY_MAX_SECONDS", 0.05)
+
+    with TestClient(main_module.app) as lifespan_client:
+        response = poll_ready(lifespan_client)
+
+        # verify the failure is reported with its cause.
+        assert response.status_code == 503
+
+        assert response.json()["status"] == "warm-up failed"
+
+        assert "missing.joblib" in response.json()["detail"]
+
+        assert response.json()["attempts"] >= 1
+
+        # verify the failed load is not cached.
+        assert main_module.tasty_model is None
+
+        # make the model available, as if its volume was mounted late.
+        monkeypatch.setattr(main_module, "MODEL_PATH", shipped_model_path)
+
+        deadline = time.monotonic() + 30
+        while lifespan_client.get("/ready").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        # verify a later attempt succeeds and the worker becomes ready.
+        response = lifespan_client.get("/ready")
+
+        assert response.status_code == 200
+
+        assert main_module.readiness["error"] is None
+
+
+
+def test_recipe_type_loads_a_failing_model_once_per_request(monkeypatch: pytest.MonkeyPatch, client: TestClient, sample_payload: Dict[str, Any]) -> None:
+    """when the model cannot be loaded, the prediction fails without a second load attempt for drift monitoring."""
+
+    attempts = []
+
+    def failing_model():
+        attempts.append(1)
+        raise RuntimeError("model unavailable")
+
+
+    # start from an unloaded worker whose model load fails.
+    monkeypatch.setattr(main_module, "tasty_model", None)
+    monkeypatch.setattr(main_module, "drift_monitor", None)
+    monkeypatch.setattr(main_module, "get_tasty_model", failing_model)
+
+    response = client.post("/recipe_type", json=sample_payload)
+
+    # verify the error is returned and the model load was attempted only once.
+    assert response.status_code == 500
+
+    assert len(attempts) == 1
@@ -0,0 +1,82 @@
+from pathlib import Path
+import pstats
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+from src.model import TastyModel
+from src.monitoring import ProfilingMiddleware, SampledProfiler
+
+
+def profiled_app(profiler: SampledProfiler) -> TestClient:
+    """TestClient of a one endpoint app wrapped in the profiling middleware."""
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "pong"}
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    return TestClient(app)
+
+
+
+def test_profile_header_is_honoured_only_when_allowed(tmp_path: Path) -> None:
+    """the X-Profile header triggers a profile of the handler only if requested profiles are allowed."""
+
+    # send the header to an app whose profiler does not allow requested profiles.
+    profiled_app(SampledProfiler(sample_rate=0, output_dir=tmp_path / "denied")).get("/ping", headers={"X-Profile": "true"})
+
+    # verify nothing is written.
+    assert not (tmp_path / "denied").exists()
+
+    # send the header to an app whose profiler allows requested profiles.
+    client = profiled_app(SampledProfiler(sample_rate=0, output_dir=tmp_path / "allowed", allow_requested=True))
+    client.get("/ping")
+    response = client.get("/ping", headers={"X-Profile": "true"})
+
+    # verify only the requested request is dumped, including its handler.
+    assert response.status_code == 200
+
+    dumps = list((tmp_path / "allowed").glob("*-ping.pstats"))
+
+    assert len(dumps) == 1
+
+    assert any(function == "ping" for _, _, function in pstats.Stats(str(dumps[0])).stats)
+
+
+
+def test_sampled_profiler_keeps_only_most_recent_dumps(tmp_path: Path) -> None:
+    """sampled dumps beyond max_dumps are deleted, oldest first."""
+
+    client = profiled_app(SampledProfiler(sample_rate=1, output_dir=tmp_path, max_dumps=3))
+
+    for _ in range(5):
+        client.get("/ping")
+
+    # verify only the cap is kept.
+    assert len(list(tmp_path.glob("*.pstats"))) == 3
+
+
+
+@pytest.mark.parametrize("profile", [True, False])
+def test_train_returns_stage_report_only_when_profiling(recipe_data: pd.DataFrame, profile: bool) -> None:
+    """TastyModel.train reports its split, preprocess, baseline, fit and predict stages when profiling is enabled."""
+
+    model = TastyModel(model=RandomForestClassifier(n_estimators=5, max_depth=3, random_state=42), profile=profile)
+    report = model.train(recipe_data, cols_to_drop=["recipe", "traffic_level"], target_column="traffic_level")
+
+    # verify nothing is reported without profiling.
+    if not profile:
+        assert report is None
+        return
+
+    # verify every stage is recorded once, in execution order, with its timing and traced memory.
+    assert list(report) == ["split", "preprocess", "baseline", "fit", "predict"]
+
+    assert all(stats["calls"] == 1 and stats["total_seconds"] >= 0 for stats in report.values())
+
+    assert all(stats["peak_memory_bytes"] is not None for stats in report.values())
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from src.benchmarks.scaling import fit_scaling_curves, generate_synthetic_recipes
+
+
+def test_generate_synthetic_recipes_matches_reference(recipe_data: pd.DataFrame) -> None:
+    """synthetic recipes have the requested size and the columns, dtypes and categories of the reference."""
+
+    synthetic = generate_synthetic_recipes(recipe_data, n_rows=5000)
+
+    # verify the size and the schema.
+    assert len(synthetic) == 5000
+
+    assert list(synthetic.columns) == list(recipe_data.columns)
+
+    assert synthetic.dtypes.to_dict() == recipe_data.dtypes.to_dict()
+
+    # verify every category and traffic level of the reference is resampled, and nothing else.
+    assert set(synthetic["category"]) == set(recipe_data["category"])
+
+    assert set(synthetic["traffic_level"]) == set(recipe_data["traffic_level"])
+
+    # verify recipe identifiers are unique and jittered numerical values stay non-negative.
+    assert synthetic["recipe"].is_unique
+
+    assert (synthetic[["calories", "carbohydrate", "sugar", "protein"]] >= 0).all().all()
+
+
+
+def test_fit_scaling_curves_recovers_known_exponents() -> None:
+    """power laws with known exponents and a known parallel speedup are recovered from synthetic results."""
+
+    results = []
+    for n_jobs, speedup in ((1, 1.0), (-1, 4.0)):
+        for n_rows in (10 ** 3, 10 ** 4, 10 ** 5):
+            results.append({
+                "n_rows": n_rows,
+                "n_jobs": n_jobs,
+                "n_estimators": 100,
+                "max_depth": 9,
+                "stages": {"split": 1e-6 * n_rows, "fit": 1e-7 * n_rows ** 1.5 / speedup},
+                "rss_increase_bytes": 200 * n_rows,
+            })
+
+    curves = {curve["n_jobs"]: curve for curve in fit_scaling_curves(results)}
+
+    # verify the exponents of the stages and of the memory increase.
+    assert curves[1]["exponents"]["split"] == pytest.approx(1.0)
+
+    assert curves[1]["exponents"]["fit"] == pytest.approx(1.5)
+
+    assert curves[1]["exponents"]["rss_increase"] == pytest.approx(1.0)
+
+    # verify the speedup over n_jobs=1 and the bottleneck at the largest size.
+    assert curves[-1]["speedup"]["fit"] == pytest.approx(4.0)
+
+    assert curves[-1]["speedup"]["split"] == pytest.approx(1.0)
+
+    assert curves[1]["bottleneck"] == "fit"
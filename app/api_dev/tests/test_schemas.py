@@ -1,4 +1,4 @@
-from app.api_dev.schemas import PredictionInput, PredictionOutput
+from app.api_dev.schemas import PredictionInput, PredictionOutput, ExplanationOutput
 
 
 def test_prediction_input_model_creates_instance() -> None:
@@ -37,3 +37,21 @@ def test_prediction_output_model_creates_instance() -> None:
     
     assert 0.0 <= result.trafficProbability <= 1.0
 
+
+
+
+def test_explanation_output_model_creates_instance() -> None:
+    """ExplanationOutput holds the base value and per-field contributions."""
+
+    # create an instance of ExplanationOutput to verify that the schema correctly validates the explanation data.
+    result = ExplanationOutput(
+        prediction="High Traffic",
+        trafficProbability=0.8,
+        baseValue=0.6,
+        contributions={"category": 0.25, "protein": -0.05},
+    )
+
+    # verify that the instance fields match the expected explanation values.
+    assert result.prediction == "High Traffic"
+
+    assert result.contributions["category"] == 0.25
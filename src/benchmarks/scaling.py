@@ -0,0 +1,296 @@
+from typing import Dict, List, Optional, Sequence, Union
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from src.model import TastyModel
+
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+REFERENCE_DATA_PATH = PROJECT_ROOT / "data" / "cleaned_data.csv"
+
+NUMERICAL_FEATURES = ['calories', 'carbohydrate', 'sugar', 'protein']
+COLS_TO_DROP = ['recipe', 'traffic_level']
+TARGET_COLUMN = 'traffic_level'
+
+# Relative standard deviation of the noise added to resampled numerical features.
+JITTER = 0.05
+
+
+def generate_synthetic_recipes(reference: pd.DataFrame, n_rows: int, random_state: int = 42) -> pd.DataFrame:
+    """
+    Generate a synthetic recipe dataset matching the distributions of a reference dataset.
+
+    Rows are resampled with replacement, so category frequencies, servings and the joint
+    relationship between features and traffic level are preserved. Numerical features get
+    multiplicative Gaussian jitter so the synthetic rows are not exact duplicates.
+
+    Args:
+        reference (pd.DataFrame): The reference dataset, e.g. `data/cleaned_data.csv`.
+        n_rows (int): Number of rows to generate.
+        random_state (int, optional): Seed of the generator. Defaults to 42.
+
+    Returns:
+        pd.DataFrame: The synthetic dataset, with the same columns as the reference.
+    """
+
+    rng = np.random.default_rng(random_state)
+
+    synthetic = reference.iloc[rng.integers(0, len(reference), size=n_rows)].reset_index(drop=True)
+
+    jitter = rng.normal(1.0, JITTER, size=(n_rows, len(NUMERICAL_FEATURES)))
+    synthetic[NUMERICAL_FEATURES] = np.clip(synthetic[NUMERICAL_FEATURES].to_numpy() * jitter, 0, None)
+    synthetic['recipe'] = np.arange(1, n_rows + 1)
+
+    return synthetic
+
+
+def _peak_rss_bytes() -> int:
+    """Return the peak resident set size of the current process in bytes, since the last reset where supported."""
+
+    # On Linux, VmHWM is the peak since the last `_reset_peak_rss`, unlike ru_maxrss which covers the process life.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+
+    except OSError:
+        pass
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the peak resident set size to the current one, returning whether the platform supports it (Linux only)."""
+
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+
+        return True
+
+    except OSError:
+        return False
+
+
+def _current_rss_bytes() -> int:
+    """Return the current resident set size of the current process in bytes, or the peak where unavailable."""
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+
+    except OSError:
+        return _peak_rss_bytes()
+
+
+def run_configuration(n_rows: int, n_jobs: int, n_estimators: int, max_depth: Optional[int],
+                      cv: int = 0, reference_path: Union[Path, str] = REFERENCE_DATA_PATH) -> Dict:
+    """
+    Train (and optionally cross-validate) a TastyModel on a synthetic dataset and measure it.
+
+    Meant to run in a fresh process, so the peak RSS only reflects this configuration. Once the synthetic
+    data is generated, the peak RSS is reset (on Linux) and the current RSS (interpreter, libraries and
+    dataset) is recorded as the baseline, so the RSS increase isolates the memory of training itself rather
+    than the temporaries of data generation. Where the peak cannot be reset, `peak_rss_reset` is False and
+    the increase may include data generation.
+
+    Args:
+        n_rows (int): Number of synthetic rows.
+        n_jobs (int): `n_jobs` of the RandomForestClassifier.
+        n_estimators (int): `n_estimators` of the RandomForestClassifier.
+        max_depth (Optional[int]): `max_depth` of the RandomForestClassifier.
+        cv (int, optional): Number of cross-validation folds, 0 to skip cross-validation. Defaults to 0.
+        reference_path (Union[Path, str], optional): The reference dataset. Defaults to `data/cleaned_data.csv`.
+
+    Returns:
+        Dict: The configuration, per stage wall time in seconds, total wall time, the baseline RSS and the peak
+            RSS since it in bytes, the RSS increase above the baseline in bytes, whether the peak was reset after
+            generation and test F1.
+    """
+
+    start = time.perf_counter()
+    df = generate_synthetic_recipes(pd.read_csv(reference_path), n_rows)
+    stages = {"generate": time.perf_counter() - start}
+
+    # Forget the peak reached by the generation temporaries, so the increase only covers training.
+    peak_rss_reset = _reset_peak_rss()
+    baseline_rss = _current_rss_bytes()
+
+    model = TastyModel(
+        RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth, n_jobs=n_jobs, random_state=42),
+        profile=True
+    )
+
+    # Memory tracing would distort the timings; peak memory is measured as process RSS instead.
+    model.profiler.trace_memory = False
+
+    start = time.perf_counter()
+    report = model.train(df, COLS_TO_DROP, TARGET_COLUMN)
+
+    if cv:
+        report.update({
+            f"cv_{stage}": stats for stage, stats in model.cross_validate(df, COLS_TO_DROP, TARGET_COLUMN, cv=cv).items()
+        })
+
+    wall_seconds = time.perf_counter() - start
+    peak_rss = _peak_rss_bytes()
+    stages.update({stage: stats["total_seconds"] for stage, stats in report.items()})
+
+    return {
+        "n_rows": n_rows,
+        "n_jobs": n_jobs,
+        "n_estimators": n_estimators,
+        "max_depth": max_depth,
+        "stages": stages,
+        "wall_seconds": wall_seconds,
+        "baseline_rss_bytes": baseline_rss,
+        "peak_rss_bytes": peak_rss,
+        "rss_increase_bytes": max(peak_rss - baseline_rss, 0),
+        "peak_rss_reset": peak_rss_reset,
+        "test_f1_score": model.metrics["test_f1_score"],
+    }
+
+
+def fit_scaling_curves(results: List[Dict]) -> List[Dict]:
+    """
+    Fit a power law time = a * n_rows ** exponent per stage, for every (n_jobs, estimator) series.
+
+    An exponent close to 1 means the stage scales linearly with the data size; above 1 it scales
+    worse than linearly. The speedup compares each series with its n_jobs=1 counterpart at the largest size.
+
+    Args:
+        results (List[Dict]): The measurements returned by `run_configuration`.
+
+    Returns:
+        List[Dict]: Per series, the fitted exponent of every stage and of the RSS increase, the speedup
+            over n_jobs=1 per stage, and the stage taking the largest share of time at the largest size.
+    """
+
+    # Group the measurements by series, and index the serial runs for the speedup comparison.
+    series = {}
+    serial = {}
+    for result in results:
+        settings = (result["n_jobs"], result["n_estimators"], result["max_depth"])
+        series.setdefault(settings, []).append(result)
+
+        if result["n_jobs"] == 1:
+            serial[(result["n_estimators"], result["max_depth"], result["n_rows"])] = result["stages"]
+
+    curves = []
+
+    for (n_jobs, n_estimators, max_depth), runs in series.items():
+        runs = sorted(runs, key=lambda run: run["n_rows"])
+        largest = runs[-1]
+        stages = list(largest["stages"])
+
+        curve = {
+            "n_jobs": n_jobs,
+            "n_estimators": n_estimators,
+            "max_depth": max_depth,
+            "exponents": {},
+            "speedup": {},
+            "bottleneck": max(stages, key=lambda stage: largest["stages"][stage]),
+        }
+
+        # A power law needs at least two sizes to be fitted.
+        if len({run["n_rows"] for run in runs}) > 1:
+            log_rows = np.log([run["n_rows"] for run in runs])
+
+            # The RSS increase excludes the fixed interpreter and library footprint, which would flatten the curve.
+            for stage in stages + ["rss_increase"]:
+                values = [max(run["rss_increase_bytes"], 1) if stage == "rss_increase" else max(run["stages"][stage], 1e-9)
+                          for run in runs]
+                curve["exponents"][stage] = float(np.polyfit(log_rows, np.log(values), 1)[0])
+
+        serial_stages = serial.get((n_estimators, max_depth, largest["n_rows"]))
+        if serial_stages is not None:
+            curve["speedup"] = {stage: serial_stages[stage] / max(largest["stages"][stage], 1e-9) for stage in stages}
+
+        curves.append(curve)
+
+    return curves
+
+
+def run_benchmark(sizes: Sequence[int], n_jobs: Sequence[int], n_estimators: Sequence[int],
+                  max_depths: Sequence[Optional[int]], cv: int = 0,
+                  output: Optional[Union[Path, str]] = None) -> Dict:
+    """
+    Sweep data sizes, core counts and estimator settings, each configuration in a fresh process.
+
+    Args:
+        sizes (Sequence[int]): Numbers of synthetic rows, e.g. 10**3 to 10**7.
+        n_jobs (Sequence[int]): `n_jobs` values of the RandomForestClassifier.
+        n_estimators (Sequence[int]): `n_estimators` values of the RandomForestClassifier.
+        max_depths (Sequence[Optional[int]]): `max_depth` values of the RandomForestClassifier.
+        cv (int, optional): Number of cross-validation folds, 0 to skip cross-validation. Defaults to 0.
+        output (Optional[Union[Path, str]], optional): Where to write the JSON report. Defaults to None.
+
+    Returns:
+        Dict: The report, with the raw 'results' and the fitted 'curves'.
+    """
+
+    results = []
+
+    # A spawned process per configuration keeps peak RSS measurements independent.
+    context = multiprocessing.get_context("spawn")
+
+    for n_rows, jobs, estimators, depth in product(sizes, n_jobs, n_estimators, max_depths):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_configuration, n_rows, jobs, estimators, depth, cv).result()
+
+        print(f"Rows: {n_rows:>10} | n_jobs: {jobs:>3} | n_estimators: {estimators:>4} | max_depth: {str(depth):>4} | "
+              f"Wall: {result['wall_seconds']:8.2f}s | Peak RSS: {result['peak_rss_bytes'] / 2 ** 20:8.1f}MB "
+              f"(+{result['rss_increase_bytes'] / 2 ** 20:.1f}MB) | "
+              f"F1: {result['test_f1_score']:.4f}")
+
+        results.append(result)
+
+    report = {"results": results, "curves": fit_scaling_curves(results)}
+
+    for curve in report["curves"]:
+        exponents = ", ".join(f"{stage}={exponent:.2f}" for stage, exponent in curve["exponents"].items())
+        print(f"n_jobs={curve['n_jobs']} n_estimators={curve['n_estimators']} max_depth={curve['max_depth']}: "
+              f"exponents [{exponents}], bottleneck: {curve['bottleneck']}")
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2, default=float)
+
+        print(f"Scaling report saved to {output}")
+
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    """Parse the command line and run the scaling benchmark."""
+
+    parser = argparse.ArgumentParser(description="Benchmark how TastyModel training scales with data size and cores.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** 3, 10 ** 4, 10 ** 5],
+                        help="Numbers of synthetic rows (e.g. 1000 10000 ... 10000000).")
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, -1], help="RandomForestClassifier n_jobs values.")
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=[100], help="RandomForestClassifier n_estimators values.")
+    parser.add_argument("--max-depth", type=int, nargs="+", default=[9], help="RandomForestClassifier max_depth values.")
+    parser.add_argument("--cv", type=int, default=0, help="Cross-validation folds to also benchmark, 0 to skip.")
+    parser.add_argument("--output", type=Path, default=None, help="Path of the JSON report.")
+    args = parser.parse_args(argv)
+
+    run_benchmark(args.sizes, args.n_jobs, args.n_estimators, args.max_depth, cv=args.cv, output=args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
-from typing import Tuple, List, Union, Tuple
+from typing import Tuple, List, Union, Tuple, Dict, Optional
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
@@ -10,12 +9,15 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 import joblib
+from ..monitoring import DriftMonitor, StageProfiler
+from .importance import source_feature_groups, permutation_importance, save_importance_report
+from .explain import make_explainer
 
 
 
 class TastyModel:
 
-    def __init__(self, model=None):
+    def __init__(self, model=None, profile: bool = False):
         """
         Initialize the TastyModel.
 
@@ -24,9 +26,16 @@ class TastyModel:
                  a placeholder message is set indicating that a classifier is needed.
         - preprocessor: A ColumnTransformer object that will be set during the preprocessing step.
         - metrics: A dictionary to store evaluation metrics for the model.
+        - baseline: Training feature distribution sketches used for drift monitoring, set during preprocessing.
+        - X_train, y_train, X_test, y_test: The preprocessed splits, kept by `train` for feature importance
+          and model compaction.
+        - reference: Mean of the preprocessed training matrix, the reference sample of linear explanations.
+        - explainer: Per-prediction explainer, built when the model is trained or loaded.
+        - profiler: A StageProfiler timing each stage and capturing its peak memory, when profiling is enabled.
 
         Args:
             model (optional): A scikit-learn classifier instance. Defaults to None.
+            profile (bool, optional): Whether to record stage timings and peak memory. Defaults to False.
 
         Usage:
             >>> from sklearn.ensemble import RandomForestClassifier
@@ -40,6 +49,14 @@ class TastyModel:
         self.model = model
         self.preprocessor = None  # This will be set during preprocessing!
         self.metrics = {}
+        self.baseline = None  # This will be set during preprocessing!
+        self.X_train = None  # This will be set during training!
+        self.y_train = None
+        self.X_test = None
+        self.y_test = None
+        self.reference = None
+        self.explainer = None
+        self.profiler = StageProfiler(enabled=profile)
 
         
     def preprocess(self, df: pd.DataFrame, cols_to_drop: List, target_column: str, test_size: int, cv: bool):
@@ -52,6 +69,10 @@ class TastyModel:
         4. Identifies numerical and categorical features.
         5. Applies MinMax scaling to numerical features.
         6. Applies OneHot encoding to categorical features.
+        7. Records the training feature distributions as the drift monitoring baseline (train/test split only).
+
+        When profiling is enabled, steps 1-3 are recorded as the "split" stage, steps 4-6 as "preprocess" and
+        step 7 as "baseline". Without a split (cv), steps 1-6 are all recorded as "preprocess".
 
         Args:
             df (pd.DataFrame): The input DataFrame containing the data to be preprocessed.
@@ -64,59 +85,70 @@ class TastyModel:
                 preprocessed testing features, and testing labels.
         """
       
-        self.target_column = target_column
-        X = df.drop(columns=cols_to_drop, axis=1)
-        y = df[self.target_column]
+        if cv:
+            with self.profiler.stage("preprocess"):
+                self.target_column = target_column
+                X = df.drop(columns=cols_to_drop, axis=1)
 
-        # Encode target variable: low -> 0, high -> 1.
-        y = df[self.target_column].map({'Low': 0, 'High': 1}) 
+                # Encode target variable: low -> 0, high -> 1.
+                y = df[self.target_column].map({'Low': 0, 'High': 1})
 
-        if cv:
-            
-            # Ensure X is in pandas DataFrames.
-            X = pd.DataFrame(X, columns=X.columns)
-    
-            # Identify numerical and categorical features.
-            numerical_features = X.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            categorical_features = X.select_dtypes(include=['category', 'object']).columns.tolist()
-    
-            # Define the ColumnTransformer for preprocessing.
-            self.preprocessor = ColumnTransformer(
-                transformers=[
-                    ('num', MinMaxScaler(), numerical_features),
-                    ('cat', OneHotEncoder(), categorical_features)
-                    ]
-                    )
-            
-            # Apply the preprocessing on the training and test data.
-            X_preprocessed = self.preprocessor.fit_transform(X)
+                # Ensure X is in pandas DataFrames.
+                X = pd.DataFrame(X, columns=X.columns)
+
+                # Identify numerical and categorical features.
+                numerical_features = X.select_dtypes(include=['float64', 'int64']).columns.tolist()
+                categorical_features = X.select_dtypes(include=['category', 'object']).columns.tolist()
+
+                # Define the ColumnTransformer for preprocessing.
+                self.preprocessor = ColumnTransformer(
+                    transformers=[
+                        ('num', MinMaxScaler(), numerical_features),
+                        ('cat', OneHotEncoder(), categorical_features)
+                        ]
+                        )
+
+                # Apply the preprocessing on the training and test data.
+                X_preprocessed = self.preprocessor.fit_transform(X)
 
             return X_preprocessed, y
 
         else:
-            # Split data into train and test sets.
-            X_train, X_test, y_train, y_test = train_test_split(
-                X.values, y.values, test_size=test_size, random_state=42, stratify=y, shuffle=True)
-            
-            # Ensure X_train and X_test are pandas DataFrames.
-            X_train = pd.DataFrame(X_train, columns=X.columns)
-            X_test = pd.DataFrame(X_test, columns=X.columns)
-    
-            # Identify numerical and categorical features.
-            numerical_features = X.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            categorical_features = X.select_dtypes(include=['category', 'object']).columns.tolist()
-    
-            # Define the ColumnTransformer for preprocessing.
-            self.preprocessor = ColumnTransformer(
-                transformers=[
-                    ('num', MinMaxScaler(), numerical_features),
-                    ('cat', OneHotEncoder(), categorical_features)
-                    ]
-                    )
-            
-            # Apply the preprocessing on the training and test data.
-            X_train_preprocessed = self.preprocessor.fit_transform(X_train)
-            X_test_preprocessed = self.preprocessor.transform(X_test)
+            with self.profiler.stage("split"):
+                self.target_column = target_column
+                X = df.drop(columns=cols_to_drop, axis=1)
+
+                # Encode target variable: low -> 0, high -> 1.
+                y = df[self.target_column].map({'Low': 0, 'High': 1})
+
+                # Split data into train and test sets.
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X.values, y.values, test_size=test_size, random_state=42, stratify=y, shuffle=True)
+
+                # Ensure X_train and X_test are pandas DataFrames.
+                X_train = pd.DataFrame(X_train, columns=X.columns)
+                X_test = pd.DataFrame(X_test, columns=X.columns)
+
+            with self.profiler.stage("preprocess"):
+                # Identify numerical and categorical features.
+                numerical_features = X.select_dtypes(include=['float64', 'int64']).columns.tolist()
+                categorical_features = X.select_dtypes(include=['category', 'object']).columns.tolist()
+
+                # Define the ColumnTransformer for preprocessing.
+                self.preprocessor = ColumnTransformer(
+                    transformers=[
+                        ('num', MinMaxScaler(), numerical_features),
+                        ('cat', OneHotEncoder(), categorical_features)
+                        ]
+                        )
+
+                # Apply the preprocessing on the training and test data.
+                X_train_preprocessed = self.preprocessor.fit_transform(X_train)
+                X_test_preprocessed = self.preprocessor.transform(X_test)
+
+            # Record the training distributions so served traffic can be compared against them.
+            with self.profiler.stage("baseline"):
+                self.baseline = DriftMonitor.from_preprocessor(self.preprocessor).fit_baseline(X_train)
 
             return X_train_preprocessed, y_train, X_test_preprocessed, y_test 
 
@@ -137,18 +169,27 @@ class TastyModel:
             test_size (int, optional): The proportion of the dataset to include in the test split. Defaults to 0.15.
 
         Returns:
-            None
+            Optional[Dict]: The stage profiling report (split, preprocess, baseline, fit, predict) when profiling
+                is enabled, else None.
         """
+
+        self.profiler.reset()
         
-        # Retrieve the preprocessed data.
+        # Retrieve the preprocessed data, recording its own stages.
         X_train, y_train, X_test, y_test = self.preprocess(df, cols_to_drop, target_column, test_size, cv=False)
 
+        # Keep the preprocessed splits so feature importance and compaction do not redo the preprocessing.
+        self.X_train, self.y_train = X_train, y_train
+        self.X_test, self.y_test = X_test, y_test
+
         # Fit the model on the training data.
-        self.model.fit(X_train, y_train)
+        with self.profiler.stage("fit"):
+            self.model.fit(X_train, y_train)
 
         # Predict the labels for the training and testing data.
-        train_pred = self.model.predict(X_train)
-        test_pred = self.model.predict(X_test)
+        with self.profiler.stage("predict"):
+            train_pred = self.model.predict(X_train)
+            test_pred = self.model.predict(X_test)
 
         # Store training evaluation metrics.
         self.metrics.update({
@@ -166,9 +207,15 @@ class TastyModel:
             "test_f1_score": f1_score(y_test, test_pred)
             })
 
+        # Precompute the explainer of the freshly trained model.
+        self.reference = np.asarray(X_train.mean(axis=0)).ravel()
+        self._build_explainer()
+
         # Print the testing accuracy.
         print(f"Model Trained - Accuracy: {self.metrics['test_accuracy']:.4f} ")
 
+        return self.profiler.report() if self.profiler.enabled else None
+
 
     def evaluate(self):
         """
@@ -206,56 +253,93 @@ class TastyModel:
             cv (int, optional): The number of cross-validation folds. Defaults to 5.
 
         Returns:
-            None
+            Optional[Dict]: The stage profiling report (preprocess, cross_validate) when profiling is enabled, else None.
         """
 
-        # Retrieve the preprocessed data.
+        self.profiler.reset()
+
+        # Retrieve the preprocessed data, recording its own stage.
         X, y = self.preprocess(df, cols_to_drop, target_column, test_size=1, cv=True)
 
         # Perform cross-validation.
-        scores = cross_val_score(self.model, X, y, cv=cv)
+        with self.profiler.stage("cross_validate"):
+            scores = cross_val_score(self.model, X, y, cv=cv)
 
         # Print cross-validation scores.
         print(f"Cross-validation scores: {scores}")
         print(f"Mean cross-validation score: {np.mean(scores):.4f}")
 
+        return self.profiler.report() if self.profiler.enabled else None
+
 
-    def feature_importance(self, ):
+    def feature_importance(self, n_repeats: int = 10, n_jobs: Optional[int] = None,
+                           output_dir: Optional[Union[Path, str]] = None) -> Dict:
         """
-        Show feature importance (for tree-based models).
+        Compute feature importance per source feature.
+
+        This method performs the following steps:
+        1. Computes permutation importance (decrease in test F1 score) on the preprocessed test matrix
+           kept by `train`, running the (feature, repeat) shuffles in parallel. Models loaded with
+           `load_model` have no held-out split, so this step is skipped for them.
+        2. Sums impurity-based importances of tree-based models back to their source feature.
+        3. Optionally writes the report as JSON and a PNG bar chart, without an interactive backend.
 
-        This method displays a bar chart of feature importances if the model has the attribute `feature_importances_`.
-        If the model does not support feature importances, it prints a message indicating that feature importance
-        is not available for this model.
+        One-hot encoded columns of a categorical feature are shuffled together, so every
+        importance refers to one of the original input features.
+
+        Args:
+            n_repeats (int, optional): Number of shuffles per feature. Defaults to 10.
+            n_jobs (Optional[int], optional): Number of parallel workers, -1 for all cores. Defaults to None (serial).
+            output_dir (Optional[Union[Path, str]], optional): Directory to write feature_importance.json
+                and feature_importance.png to. Defaults to None (nothing is written).
 
         Returns:
-            None
+            Dict: The report, with per source feature permutation importance mean and standard deviation
+                (None without a held-out split) and, when available, the aggregated impurity importance,
+                sorted by permutation importance (or impurity importance without a held-out split).
+
+        Raises:
+            ValueError: If there is neither a held-out split nor impurity-based importances.
         """
-        
+
+        feature_groups = source_feature_groups(self.preprocessor)
+
+        # Sum the impurity importances of one-hot columns back to their source feature.
+        impurity = None
         if hasattr(self.model, "feature_importances_"):
-            importance = self.model.feature_importances_
-
-            # Get feature names from the ColumnTransformer.
-            feature_names = []
-            for name, transformer, columns in self.preprocessor.transformers_:
-                if name == 'num':
-                    feature_names.extend(columns)
-
-                elif name == 'cat':
-                    # Get the names of the one-hot encoded features.
-                    encoder = transformer
-                    encoded_feature_names = encoder.get_feature_names_out(columns)
-                    feature_names.extend(encoded_feature_names)
-
-            plt.figure(figsize=(10, 5))
-            plt.barh(range(len(importance)), importance)
-            plt.xlabel("Feature Importance")
-            plt.ylabel("Feature Index")
-            plt.title("Feature Importance")
-            plt.show()
+            impurity = {feature: float(np.sum(self.model.feature_importances_[columns]))
+                        for feature, columns in feature_groups.items()}
+
+        permutation = None
+        if self.X_test is not None:
+            permutation = permutation_importance(self.model, self.X_test, self.y_test, feature_groups,
+                                                 n_repeats=n_repeats, n_jobs=n_jobs)
+            features = sorted(feature_groups, key=lambda feature: permutation[feature]["mean"], reverse=True)
+
+        elif impurity is not None:
+            features = sorted(feature_groups, key=lambda feature: impurity[feature], reverse=True)
 
         else:
-            print("Feature importance not available for this model!")
+            raise ValueError("Model must be trained, or be tree-based, to compute feature importance.")
+
+        report = {
+            "scoring": "f1_score" if permutation is not None else None,
+            "n_repeats": n_repeats if permutation is not None else None,
+            "features": {
+                feature: {
+                    "permutation_mean": permutation[feature]["mean"] if permutation is not None else None,
+                    "permutation_std": permutation[feature]["std"] if permutation is not None else None,
+                    "impurity": impurity[feature] if impurity is not None else None
+                }
+                for feature in features
+            }
+        }
+
+        if output_dir is not None:
+            json_path, png_path = save_importance_report(report, output_dir)
+            print(f"Feature importance saved to {json_path} and {png_path}")
+
+        return report
 
 
     def save_model(self, filename: Union[Path, str]):
@@ -273,8 +357,9 @@ class TastyModel:
         
         if self.model and self.preprocessor:
 
-            # Save both the model and the preprocessor as a dictionary.
-            joblib.dump({'model': self.model, 'preprocessor': self.preprocessor}, filename)
+            # Save the model, the preprocessor and the drift baseline as a dictionary.
+            joblib.dump({'model': self.model, 'preprocessor': self.preprocessor, 'baseline': self.baseline,
+                         'reference': self.reference}, filename)
             print(f"Model and preprocessor saved to {filename}")
     
         else:
@@ -300,6 +385,13 @@ class TastyModel:
             loaded_data = joblib.load(filename)
             self.model = loaded_data['model']
             self.preprocessor = loaded_data['preprocessor']
+
+            # Artifacts saved before drift monitoring was added do not contain a baseline.
+            self.baseline = loaded_data.get('baseline')
+            self.reference = loaded_data.get('reference')
+
+            # Precompute the explainer once, so explaining a prediction is a single vectorized pass.
+            self._build_explainer()
             print(f"Model and preprocessor loaded successfully from {filename}")
 
         except FileNotFoundError:
@@ -312,6 +404,65 @@ class TastyModel:
             print(f"An error occurred while loading the model: {e}")
 
 
+    def _build_explainer(self):
+        """Build the per-prediction explainer, if the model type supports explanations."""
+
+        try:
+            self.explainer = make_explainer(self.model, self.preprocessor, reference=self.reference)
+
+        except ValueError:
+            self.explainer = None
+
+
+    def set_reference(self, df: pd.DataFrame):
+        """
+        Set the reference sample of linear explanations from raw training data, and rebuild the explainer.
+
+        Artifacts saved before the reference was recorded use this with the training dataset, so the
+        explanation base value is the prediction for an average training recipe. Rows whose category is
+        unknown to the encoder are ignored.
+
+        Args:
+            df (pd.DataFrame): Raw recipe data containing the input feature columns.
+
+        Returns:
+            None
+        """
+
+        encoder = self.preprocessor.named_transformers_['cat']
+        categorical_columns = [columns for name, _, columns in self.preprocessor.transformers_ if name == 'cat'][0]
+
+        known = np.ones(len(df), dtype=bool)
+        for column, categories in zip(categorical_columns, encoder.categories_):
+            known &= df[column].isin(categories).to_numpy()
+
+        X = self.preprocessor.transform(df.loc[known, list(self.preprocessor.feature_names_in_)])
+        self.reference = np.asarray(X.mean(axis=0)).ravel()
+        self._build_explainer()
+
+
+    def explain_traffic(self, df: pd.DataFrame) -> Dict:
+        """
+        Explain the predicted probability of high traffic for a batch of recipes.
+
+        The contributions are additive: for every recipe, the base value plus the sum of its
+        per-feature contributions equals the predicted probability of high traffic.
+
+        Args:
+            df (pd.DataFrame): The recipe features (calories, carbohydrate, sugar, protein, category, servings),
+                one row per recipe.
+
+        Returns:
+            Dict: 'base_value', 'probabilities' (of high traffic, per recipe) and 'contributions'
+                (per recipe, a dict of feature -> contribution to the probability of high traffic).
+        """
+
+        if self.explainer is None:
+            raise ValueError("Model must be a trained tree-based or linear classifier to explain predictions.")
+
+        return self.explainer.explain(df)
+
+
     def predict_traffic_increase(self, calories: float, carbohydrate: float, sugar: float, 
                                  protein: float, category: str, servings: int) -> Tuple[str, float]:
         """
@@ -346,11 +497,13 @@ class TastyModel:
         })
 
         # Apply the preprocessing to the input data.
-        input_data_preprocessed = self.preprocessor.transform(input_data)
+        with self.profiler.stage("transform"):
+            input_data_preprocessed = self.preprocessor.transform(input_data)
 
         # Make predictions.
-        prediction = self.model.predict(input_data_preprocessed)[0]
-        prediction_probability = self.model.predict_proba(input_data_preprocessed)[0, 1]
+        with self.profiler.stage("predict_proba"):
+            prediction = self.model.predict(input_data_preprocessed)[0]
+            prediction_probability = self.model.predict_proba(input_data_preprocessed)[0, 1]
 
         # Categorize the traffic impact.
         traffic_category = "High Traffic" if prediction == 1 else "Low Traffic"
@@ -0,0 +1,342 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from pathlib import Path
+import copy
+import io
+import time
+import numpy as np
+import joblib
+from sklearn.base import clone
+from sklearn.ensemble._forest import _generate_unsampled_indices, _get_n_samples_bootstrap
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+
+from .TastyBytesModel import TastyModel
+
+
+
+# Candidate (n_estimators, max_depth) settings of distilled forests, tried from the cheapest.
+DISTILLATION_CANDIDATES = [(n_estimators, max_depth) for n_estimators in (5, 10, 20, 40) for max_depth in (3, 4, 5, 6)]
+
+
+# Smallest share of training samples a tree subset must have out-of-bag predictions for.
+MIN_OOB_COVERAGE = 0.95
+
+
+def _f1_rows(predictions: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Compute the F1 score of every row of a (n_candidates, n_samples) matrix of binary predictions, on masked samples."""
+
+    true_positives = ((predictions == 1) & (y == 1) & mask).sum(axis=1)
+    false_positives = ((predictions == 1) & (y == 0) & mask).sum(axis=1)
+    false_negatives = ((predictions == 0) & (y == 1) & mask).sum(axis=1)
+
+    denominator = 2 * true_positives + false_positives + false_negatives
+
+    return np.divide(2 * true_positives, denominator, out=np.zeros(len(predictions)), where=denominator > 0)
+
+
+def _accuracy_rows(predictions: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Compute the accuracy of every row of a (n_candidates, n_samples) matrix of binary predictions, on masked samples."""
+
+    covered = mask.sum(axis=1)
+
+    return np.divide(((predictions == y) & mask).sum(axis=1), covered, out=np.zeros(len(predictions)), where=covered > 0)
+
+
+def _oob_probabilities(model, X) -> np.ndarray:
+    """Compute the (n_trees, n_samples) high traffic probabilities of every tree, NaN where the sample is in-bag."""
+
+    n_samples = X.shape[0]
+    n_samples_bootstrap = _get_n_samples_bootstrap(n_samples, model.max_samples)
+
+    tree_probabilities = np.full((len(model.estimators_), n_samples), np.nan)
+    for index, estimator in enumerate(model.estimators_):
+        unsampled = _generate_unsampled_indices(estimator.random_state, n_samples, n_samples_bootstrap)
+        tree_probabilities[index, unsampled] = estimator.predict_proba(X[unsampled])[:, 1]
+
+    return tree_probabilities
+
+
+def _n_nodes(model) -> int:
+    """Count the nodes of all trees of a forest."""
+
+    return int(sum(estimator.tree_.node_count for estimator in model.estimators_))
+
+
+def profile_model(model, X_test, y_test, n_repeats: int = 200) -> Dict[str, float]:
+    """
+    Measure the serving cost and quality of a fitted forest.
+
+    Args:
+        model: A fitted forest classifier.
+        X_test: The preprocessed held-out features.
+        y_test: The held-out labels.
+        n_repeats (int, optional): Number of timed single-row predictions. Defaults to 200.
+
+    Returns:
+        Dict[str, float]: Number of trees and nodes, pickled artifact size in bytes, median single-row
+            and full-batch predict_proba latency in milliseconds, and test F1 and accuracy.
+    """
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+
+    single_row = X_test[:1]
+    timings = []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        model.predict_proba(single_row)
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    test_pred = model.predict(X_test)
+    batch_latency = time.perf_counter() - start
+
+    return {
+        "n_trees": len(model.estimators_),
+        "n_nodes": _n_nodes(model),
+        "artifact_bytes": buffer.getbuffer().nbytes,
+        "latency_ms": float(np.median(timings) * 1e3),
+        "batch_latency_ms": batch_latency * 1e3,
+        "test_f1_score": f1_score(y_test, test_pred),
+        "test_accuracy": accuracy_score(y_test, test_pred),
+    }
+
+
+def select_tree_subset(model, X_train, y_train, f1_tolerance: float,
+                       accuracy_tolerance: float) -> Iterator[List[int]]:
+    """
+    Greedily grow subsets of a bagged forest's trees, yielding those matching the forest out-of-bag.
+
+    Every tree is scored only on the training samples it did not see, so the selection never touches
+    the held-out split. The per-tree probabilities are computed once; each step then adds the tree that
+    maximises the out-of-bag F1 score of the averaged subset, scoring all remaining candidates in one
+    vectorized pass. Subsets are yielded from the smallest, so the caller can keep extending the greedy
+    path until a subset also passes its own check.
+
+    Args:
+        model: A fitted forest classifier trained with `bootstrap=True`.
+        X_train: The preprocessed training features the forest was fitted on.
+        y_train: The training labels.
+        f1_tolerance (float): Largest allowed drop in out-of-bag F1 score from the full forest.
+        accuracy_tolerance (float): Largest allowed drop in out-of-bag accuracy from the full forest.
+
+    Yields:
+        List[int]: Indices of the selected trees, for every proper subset on the greedy path within tolerance.
+    """
+
+    y = np.asarray(y_train)
+    tree_probabilities = _oob_probabilities(model, X_train)
+
+    in_bag = np.isnan(tree_probabilities)
+    tree_probabilities = np.where(in_bag, 0.0, tree_probabilities)
+    oob_counts = (~in_bag).astype(int)
+
+    # The full forest's out-of-bag scores, on every sample at least one tree left out, are the reference.
+    counts = oob_counts.sum(axis=0, keepdims=True)
+    forest_predictions = (tree_probabilities.sum(axis=0, keepdims=True) > 0.5 * counts).astype(int)
+    target_f1 = _f1_rows(forest_predictions, y, counts > 0)[0] - f1_tolerance
+    target_accuracy = _accuracy_rows(forest_predictions, y, counts > 0)[0] - accuracy_tolerance
+
+    selected = []
+    remaining = list(range(len(tree_probabilities)))
+    running_sum = np.zeros(tree_probabilities.shape[1])
+    running_count = np.zeros(tree_probabilities.shape[1], dtype=int)
+
+    # The subset of all trees is the forest itself, so the path stops one tree short of it.
+    while len(remaining) > 1:
+        # A sample is predicted by the subset trees it is out-of-bag for, averaged and thresholded at one half.
+        candidate_sums = running_sum + tree_probabilities[remaining]
+        candidate_counts = running_count + oob_counts[remaining]
+        covered = candidate_counts > 0
+
+        predictions = (candidate_sums > 0.5 * candidate_counts).astype(int)
+        scores = _f1_rows(predictions, y, covered)
+
+        best = int(np.argmax(scores))
+        selected.append(remaining.pop(best))
+        running_sum, running_count = candidate_sums[best], candidate_counts[best]
+
+        coverage = covered[best].mean()
+        accuracy = _accuracy_rows(predictions[best:best + 1], y, covered[best:best + 1])[0]
+
+        if coverage >= MIN_OOB_COVERAGE and scores[best] >= target_f1 and accuracy >= target_accuracy:
+            yield list(selected)
+
+
+def distill_forest(model, X_train, y_train, f1_tolerance: float, accuracy_tolerance: float,
+                   candidates: Sequence[Tuple[int, int]] = DISTILLATION_CANDIDATES, validation_size: float = 0.2):
+    """
+    Distill a forest into smaller, shallower forests matching it on a validation slice, from the cheapest.
+
+    Students keep the teacher's hyperparameters except `n_estimators` and `max_depth`, and are fitted
+    on the teacher's predictions. A slice of the training split is held back for the selection: students
+    are fitted on the rest and compared with a teacher clone fitted on the same rows, so neither has seen
+    the validation slice nor the held-out split. Every student within tolerance is then refitted on the
+    whole training split and yielded, so the caller can keep walking the candidates until one also passes
+    its own check.
+
+    Args:
+        model: The fitted teacher forest.
+        X_train: The preprocessed training features.
+        y_train: The training labels.
+        f1_tolerance (float): Largest allowed drop in validation F1 score from the teacher.
+        accuracy_tolerance (float): Largest allowed drop in validation accuracy from the teacher.
+        candidates (Sequence[Tuple[int, int]], optional): (n_estimators, max_depth) settings to try.
+            Defaults to DISTILLATION_CANDIDATES.
+        validation_size (float, optional): Share of the training split used for the selection. Defaults to 0.2.
+
+    Yields:
+        The students within tolerance on the validation slice, by increasing worst-case node count.
+    """
+
+    X_fit, X_validation, y_fit, y_validation = train_test_split(
+        X_train, y_train, test_size=validation_size, stratify=y_train, random_state=42
+    )
+
+    teacher = clone(model).fit(X_fit, y_fit)
+    teacher_validation = teacher.predict(X_validation)
+    target_f1 = f1_score(y_validation, teacher_validation) - f1_tolerance
+    target_accuracy = accuracy_score(y_validation, teacher_validation) - accuracy_tolerance
+
+    teacher_labels = model.predict(X_fit)
+    train_labels = model.predict(X_train)
+
+    # Try candidates by their worst-case node count, so the first one accepted is the cheapest.
+    for n_estimators, max_depth in sorted(candidates, key=lambda candidate: candidate[0] * 2 ** candidate[1]):
+        student = clone(model).set_params(n_estimators=n_estimators, max_depth=max_depth)
+        student_validation = student.fit(X_fit, teacher_labels).predict(X_validation)
+
+        if (f1_score(y_validation, student_validation) >= target_f1
+                and accuracy_score(y_validation, student_validation) >= target_accuracy):
+            yield student.fit(X_train, train_labels)
+
+
+def _prune(model, subset: List[int]):
+    """Return a shallow copy of a forest keeping only the given trees, which stay shared with the original."""
+
+    pruned = copy.copy(model)
+    pruned.estimators_ = [model.estimators_[index] for index in subset]
+    pruned.n_estimators = len(subset)
+
+    # Out-of-bag scores describe the full forest, not the subset.
+    for attribute in ("oob_score_", "oob_decision_function_"):
+        pruned.__dict__.pop(attribute, None)
+
+    return pruned
+
+
+def compact_model(tasty_model: TastyModel, f1_tolerance: float = 0.01, accuracy_tolerance: float = 0.01,
+                  filename: Optional[Union[Path, str]] = None) -> Tuple[TastyModel, Dict]:
+    """
+    Compact a trained forest TastyModel to reduce serving latency and artifact size.
+
+    This function performs the following steps:
+    1. Grows subsets of its trees along a greedy path scored out-of-bag, and walks the subsets within
+       tolerance of the forest, from the smallest, until one is accepted.
+    2. Walks the distilled, shallower forests within tolerance on a slice of the training split, from
+       the cheapest, until one is accepted.
+    3. A candidate is accepted only if its test F1 score and accuracy on the held-out split kept by `train`
+       are also within tolerance of the forest's.
+    4. Keeps whichever accepted candidate has the fewest nodes, and saves it if `filename` is given.
+
+    Candidates are proposed without the held-out split, which only decides when each walk stops. If no
+    candidate is accepted, the original model is returned, nothing is saved and the report says so.
+
+    Args:
+        tasty_model (TastyModel): A TastyModel trained with `train`, wrapping a forest classifier.
+        f1_tolerance (float, optional): Largest allowed drop in F1 score. Defaults to 0.01.
+        accuracy_tolerance (float, optional): Largest allowed drop in accuracy. Defaults to 0.01.
+        filename (Optional[Union[Path, str]], optional): Where to save the compact model. Defaults to None.
+
+    Returns:
+        Tuple[TastyModel, Dict]: The compact TastyModel (the original one if no candidate is accepted)
+            and a report comparing the latency, size and quality of both models, with the outcome of every search.
+
+    Raises:
+        ValueError: If the model is not a trained forest.
+    """
+
+    model = tasty_model.model
+
+    if not hasattr(model, "estimators_") or not all(hasattr(estimator, "tree_") for estimator in model.estimators_):
+        raise ValueError("Compaction requires a trained forest classifier (e.g. RandomForestClassifier).")
+
+    if tasty_model.X_test is None:
+        raise ValueError("Model must be trained with `train` so the held-out split is available.")
+
+    X_train, y_train = tasty_model.X_train, tasty_model.y_train
+    X_test, y_test = tasty_model.X_test, tasty_model.y_test
+
+    original = profile_model(model, X_test, y_test)
+
+    # Without bootstrapping every tree saw every training sample, so there is no out-of-bag estimate.
+    searches = {
+        "tree_subset": (
+            (_prune(model, subset) for subset in select_tree_subset(model, X_train, y_train, f1_tolerance, accuracy_tolerance))
+            if getattr(model, "bootstrap", False) else iter(())
+        ),
+        "distillation": distill_forest(model, X_train, y_train, f1_tolerance, accuracy_tolerance),
+    }
+
+    accepted = {}
+    searched = {}
+
+    for name, candidates in searches.items():
+        outcome = {"checked": 0, "accepted": False}
+
+        for candidate in candidates:
+            test_pred = candidate.predict(X_test)
+            outcome.update({
+                "checked": outcome["checked"] + 1,
+                "n_trees": len(candidate.estimators_),
+                "n_nodes": _n_nodes(candidate),
+                "test_f1_score": f1_score(y_test, test_pred),
+                "test_accuracy": accuracy_score(y_test, test_pred),
+            })
+
+            # Stop the walk at the first candidate within tolerance on the held-out split.
+            if (outcome["test_f1_score"] >= original["test_f1_score"] - f1_tolerance
+                    and outcome["test_accuracy"] >= original["test_accuracy"] - accuracy_tolerance):
+                outcome["accepted"] = True
+                accepted[name] = candidate
+                break
+
+        searched[name] = outcome
+
+    method = min(accepted, key=lambda name: _n_nodes(accepted[name])) if accepted else None
+
+    compact = TastyModel(model=accepted[method] if method else model)
+    compact.preprocessor = tasty_model.preprocessor
+    compact.baseline = tasty_model.baseline
+    compact.reference = tasty_model.reference
+    compact.X_train, compact.y_train = X_train, y_train
+    compact.X_test, compact.y_test = X_test, y_test
+    compact._build_explainer()
+
+    report = {
+        "method": method,
+        "f1_tolerance": f1_tolerance,
+        "accuracy_tolerance": accuracy_tolerance,
+        "original": original,
+        "compact": profile_model(compact.model, X_test, y_test) if method else None,
+        "searches": searched,
+        "saved": None,
+    }
+
+    if method is None:
+        checked = ", ".join(f"{name}={outcome['checked']}" for name, outcome in searched.items())
+        print(f"Model Not Compacted - No candidate within tolerance (checked: {checked}), nothing saved.")
+
+        return compact, report
+
+    print(f"Model Compacted ({method}) - Trees: {report['original']['n_trees']} -> {report['compact']['n_trees']}, "
+          f"Nodes: {report['original']['n_nodes']} -> {report['compact']['n_nodes']}, "
+          f"Latency: {report['original']['latency_ms']:.2f}ms -> {report['compact']['latency_ms']:.2f}ms, "
+          f"F1: {report['original']['test_f1_score']:.4f} -> {report['compact']['test_f1_score']:.4f}, "
+          f"Accuracy: {report['original']['test_accuracy']:.4f} -> {report['compact']['test_accuracy']:.4f}")
+
+    if filename is not None:
+        compact.save_model(filename)
+        report["saved"] = str(filename)
+
+    return compact, report
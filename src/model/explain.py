@@ -0,0 +1,202 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .importance import source_feature_groups
+
+
+
+class TreePathExplainer:
+
+    def __init__(self, model, preprocessor):
+        """
+        Initialize the TreePathExplainer.
+
+        Precomputes, for every node of every tree, how much the probability of high traffic changes
+        when a sample moves from the parent node into that node, and which feature made the split.
+        Explaining a batch is then a single decision path lookup and one sparse matrix product:
+        the contributions of a sample are the sum of the per-node changes along its paths.
+
+        The contributions are additive: base value + sum of contributions equals `predict_proba`.
+
+        Args:
+            model: A fitted DecisionTreeClassifier, or a forest of them (e.g. RandomForestClassifier).
+            preprocessor (ColumnTransformer): The fitted ColumnTransformer of the TastyModel.
+        """
+
+        self.model = model
+        self.preprocessor = preprocessor
+
+        trees = model.estimators_ if hasattr(model, "estimators_") else [model]
+        n_columns = trees[0].tree_.n_features
+
+        rows, columns, values = [], [], []
+        base_values = []
+        offset = 0
+
+        for estimator in trees:
+            tree = estimator.tree_
+
+            # Probability of the high traffic class at every node.
+            node_value = tree.value[:, 0, :]
+            node_value = node_value[:, 1] / node_value.sum(axis=1)
+
+            # Every child receives the change in probability caused by its parent's split feature.
+            parents = np.flatnonzero(tree.children_left != -1)
+            children = np.concatenate([tree.children_left[parents], tree.children_right[parents]])
+            parents = np.concatenate([parents, parents])
+
+            rows.append(children + offset)
+            columns.append(tree.feature[parents])
+            values.append(node_value[children] - node_value[parents])
+
+            base_values.append(node_value[0])
+            offset += tree.node_count
+
+        # The forest averages its trees, so every node contributes with weight 1 / n_trees.
+        self.node_contributions = sparse.csr_matrix(
+            (np.concatenate(values) / len(trees), (np.concatenate(rows), np.concatenate(columns))),
+            shape=(offset, n_columns)
+        )
+        self.base_value = float(np.mean(base_values))
+        self.feature_groups = source_feature_groups(preprocessor)
+
+
+    def _column_contributions(self, X) -> np.ndarray:
+        """Compute per preprocessed column contributions with one decision path traversal."""
+
+        if hasattr(self.model, "estimators_"):
+            indicator, _ = self.model.decision_path(X)
+
+        else:
+            indicator = self.model.decision_path(X)
+
+        return np.asarray((indicator @ self.node_contributions).todense())
+
+
+    def explain(self, df: pd.DataFrame) -> Dict:
+        """
+        Explain the high traffic probability of a batch of recipes.
+
+        Args:
+            df (pd.DataFrame): The raw input features, one row per recipe.
+
+        Returns:
+            Dict: 'base_value' (the expected probability), 'probabilities' (predict_proba of high traffic, per row)
+                and 'contributions' (per row, a dict of source feature -> contribution).
+
+        Raises:
+            ValueError: If the contributions do not add up to the predicted probabilities.
+        """
+
+        X = self.preprocessor.transform(df)
+        column_contributions = self._column_contributions(X)
+
+        return _aggregate(self.base_value, column_contributions, self.feature_groups,
+                          self.model.predict_proba(X)[:, 1], self.base_value + column_contributions.sum(axis=1))
+
+
+
+class LinearExplainer:
+
+    def __init__(self, model, preprocessor, reference: Optional[np.ndarray] = None):
+        """
+        Initialize the LinearExplainer.
+
+        Linear models are additive in log-odds: column j contributes coef_j * (x_j - reference_j).
+        To report contributions on the same probability scale as the tree explainer, the log-odds
+        contributions of a sample are rescaled so they add up to predict_proba minus the base value.
+
+        Args:
+            model: A fitted binary linear classifier with `coef_` and `intercept_` (e.g. LogisticRegression).
+            preprocessor (ColumnTransformer): The fitted ColumnTransformer of the TastyModel.
+            reference (Optional[np.ndarray], optional): Preprocessed reference sample, usually the mean
+                of the training matrix. Defaults to None (all zeros, i.e. every numerical feature at its
+                training minimum and no category, which is not a real recipe).
+        """
+
+        self.model = model
+        self.preprocessor = preprocessor
+
+        self.coef = np.asarray(model.coef_)[0]
+        self.reference = np.zeros_like(self.coef) if reference is None else np.asarray(reference, dtype=float)
+
+        self.base_logit = float(model.intercept_[0] + self.coef @ self.reference)
+        self.base_value = float(1 / (1 + np.exp(-self.base_logit)))
+        self.feature_groups = source_feature_groups(preprocessor)
+
+
+    def explain(self, df: pd.DataFrame) -> Dict:
+        """
+        Explain the high traffic probability of a batch of recipes.
+
+        Args:
+            df (pd.DataFrame): The raw input features, one row per recipe.
+
+        Returns:
+            Dict: 'base_value' (the probability at the reference sample), 'probabilities' (predict_proba of
+                high traffic, per row) and 'contributions' (per row, a dict of source feature -> contribution).
+
+        Raises:
+            ValueError: If the contributions do not add up to the predicted probabilities.
+        """
+
+        X = self.preprocessor.transform(df)
+        X = X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+
+        logit_contributions = (X - self.reference) * self.coef
+        logit = self.base_logit + logit_contributions.sum(axis=1)
+        probabilities = 1 / (1 + np.exp(-logit))
+
+        # Rescale the log-odds contributions onto the probability scale, keeping their signs and ratios.
+        logit_delta = logit - self.base_logit
+        scale = np.divide(probabilities - self.base_value, logit_delta,
+                          out=np.zeros_like(logit_delta), where=logit_delta != 0)
+        column_contributions = logit_contributions * scale[:, None]
+
+        return _aggregate(self.base_value, column_contributions, self.feature_groups,
+                          self.model.predict_proba(X)[:, 1], probabilities)
+
+
+def _aggregate(base_value: float, column_contributions: np.ndarray, feature_groups: Dict[str, List[int]],
+               predicted: np.ndarray, explained: np.ndarray) -> Dict:
+    """Sum column contributions per source feature and check they add up to the predicted probabilities."""
+
+    if not np.allclose(predicted, explained, atol=1e-6):
+        raise ValueError("Feature contributions do not add up to the predicted probabilities.")
+
+    contributions = np.stack(
+        [column_contributions[:, columns].sum(axis=1) for columns in feature_groups.values()], axis=1
+    )
+
+    return {
+        "base_value": base_value,
+        "probabilities": predicted.tolist(),
+        "contributions": [dict(zip(feature_groups, row.tolist())) for row in contributions],
+    }
+
+
+def make_explainer(model, preprocessor, reference: Optional[np.ndarray] = None):
+    """
+    Build the explainer matching the type of a fitted model.
+
+    Args:
+        model: A fitted tree-based or linear scikit-learn classifier.
+        preprocessor (ColumnTransformer): The fitted ColumnTransformer of the TastyModel.
+        reference (Optional[np.ndarray], optional): Preprocessed reference sample for linear models. Defaults to None.
+
+    Returns:
+        Union[TreePathExplainer, LinearExplainer]: The explainer.
+
+    Raises:
+        ValueError: If the model is neither tree-based nor linear.
+    """
+
+    if hasattr(model, "tree_") or all(hasattr(estimator, "tree_") for estimator in getattr(model, "estimators_", [None])):
+        return TreePathExplainer(model, preprocessor)
+
+    elif hasattr(model, "coef_"):
+        return LinearExplainer(model, preprocessor, reference=reference)
+
+    raise ValueError(f"Explanations are not supported for {type(model).__name__} models.")
@@ -0,0 +1,148 @@
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from pathlib import Path
+import json
+import numpy as np
+from joblib import Parallel, delayed
+from matplotlib.figure import Figure
+from sklearn.metrics import f1_score
+
+
+
+def source_feature_groups(preprocessor) -> Dict[str, List[int]]:
+    """
+    Map every source feature to the columns it produces in the preprocessed matrix.
+
+    Numerical features map to their single scaled column, categorical features to all of
+    their one-hot encoded columns.
+
+    Args:
+        preprocessor (ColumnTransformer): The fitted ColumnTransformer with 'num' (MinMaxScaler)
+            and 'cat' (OneHotEncoder) transformers.
+
+    Returns:
+        Dict[str, List[int]]: Source feature name -> column indices, in preprocessed column order.
+    """
+
+    groups = {}
+    position = 0
+
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == 'num':
+            for column in columns:
+                groups[column] = [position]
+                position += 1
+
+        elif name == 'cat':
+            # Each categorical column expands to one column per known category.
+            for column, categories in zip(columns, transformer.categories_):
+                groups[column] = list(range(position, position + len(categories)))
+                position += len(categories)
+
+    return groups
+
+
+def _permuted_score(model, X: np.ndarray, y: np.ndarray, columns: List[int], seed: int, scoring: Callable) -> float:
+    """Score the model after shuffling the rows of the given columns together."""
+
+    X_permuted = X.copy()
+
+    # Permuting the one-hot columns of a feature jointly keeps every row a valid encoding.
+    permutation = np.random.default_rng(seed).permutation(len(X_permuted))
+    X_permuted[:, columns] = X[np.ix_(permutation, columns)]
+
+    return scoring(y, model.predict(X_permuted))
+
+
+def permutation_importance(model, X, y, feature_groups: Dict[str, List[int]], n_repeats: int = 10,
+                           n_jobs: Optional[int] = None, scoring: Callable = f1_score,
+                           random_state: int = 42) -> Dict[str, Dict[str, float]]:
+    """
+    Compute permutation importance of source features in parallel.
+
+    Every (feature, repeat) pair is an independent task, so the work spreads across all `n_jobs`
+    workers even when there are fewer features than cores.
+
+    Args:
+        model: A fitted scikit-learn classifier.
+        X: The preprocessed feature matrix (dense or sparse).
+        y: The true labels.
+        feature_groups (Dict[str, List[int]]): Source feature name -> preprocessed column indices.
+        n_repeats (int, optional): Number of shuffles per feature. Defaults to 10.
+        n_jobs (Optional[int], optional): Number of parallel workers, -1 for all cores. Defaults to None (serial).
+        scoring (Callable, optional): Metric called as scoring(y_true, y_pred). Defaults to f1_score.
+        random_state (int, optional): Seed for the shuffles. Defaults to 42.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per source feature, the mean and standard deviation of the score drop.
+    """
+
+    X = X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+    y = np.asarray(y)
+
+    baseline_score = scoring(y, model.predict(X))
+
+    # Derive an independent, reproducible seed for every task.
+    features = list(feature_groups)
+    seeds = np.random.SeedSequence(random_state).generate_state(len(features) * n_repeats)
+
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_permuted_score)(model, X, y, feature_groups[feature], int(seeds[index * n_repeats + repeat]), scoring)
+        for index, feature in enumerate(features)
+        for repeat in range(n_repeats)
+    )
+
+    drops = baseline_score - np.asarray(scores).reshape(len(features), n_repeats)
+
+    return {
+        feature: {"mean": float(drops[index].mean()), "std": float(drops[index].std())}
+        for index, feature in enumerate(features)
+    }
+
+
+def save_importance_report(report: Dict, output_dir: Union[Path, str], filename: str = "feature_importance") -> Tuple[Path, Path]:
+    """
+    Write a feature importance report as JSON and as a PNG bar chart.
+
+    The chart is drawn on a standalone matplotlib Figure, so no interactive backend is needed.
+
+    Args:
+        report (Dict): The report returned by `TastyModel.feature_importance`.
+        output_dir (Union[Path, str]): Directory to write the files to. Created if missing.
+        filename (str, optional): Base name of the written files. Defaults to "feature_importance".
+
+    Returns:
+        Tuple[Path, Path]: The paths of the JSON and PNG files.
+    """
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    json_path = output_dir / f"{filename}.json"
+    png_path = output_dir / f"{filename}.png"
+
+    with open(json_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    # Plot the least important feature first so the most important one ends up on top.
+    features = list(report["features"])[::-1]
+    figure = Figure(figsize=(10, 5))
+    ax = figure.subplots()
+
+    # Reports without a held-out split only contain impurity importances.
+    if report["scoring"] is not None:
+        means = [report["features"][feature]["permutation_mean"] for feature in features]
+        stds = [report["features"][feature]["permutation_std"] for feature in features]
+        ax.barh(features, means, xerr=stds)
+        ax.set_xlabel(f"Mean {report['scoring']} decrease")
+        ax.set_title("Permutation Feature Importance")
+
+    else:
+        ax.barh(features, [report["features"][feature]["impurity"] for feature in features])
+        ax.set_xlabel("Impurity importance")
+        ax.set_title("Impurity Feature Importance")
+
+    ax.set_ylabel("Feature")
+    figure.tight_layout()
+    figure.savefig(png_path)
+
+    return json_path, png_path
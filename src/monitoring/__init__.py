@@ -0,0 +1,2 @@
+from .drift import DriftMonitor
+from .profiling import StageProfiler, SampledProfiler, ProfilingMiddleware
@@ -0,0 +1,370 @@
+from typing import Dict, List, Optional, Sequence, Union
+from collections import deque
+from itertools import chain
+from operator import attrgetter
+from pathlib import Path
+import threading
+import pandas as pd
+import numpy as np
+import joblib
+
+
+
+# Population Stability Index thresholds commonly used to flag feature drift.
+PSI_MODERATE_DRIFT = 0.1
+PSI_SIGNIFICANT_DRIFT = 0.25
+
+# Floor applied to bin proportions so empty bins do not produce infinite PSI values.
+PROPORTION_EPSILON = 1e-4
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """
+    Compute the Population Stability Index (PSI) between two binned distributions.
+
+    Args:
+        expected (np.ndarray): Bin counts of the baseline (training) distribution.
+        actual (np.ndarray): Bin counts of the observed (served) distribution.
+
+    Returns:
+        float: The PSI value. 0 means identical distributions, values above 0.25 usually indicate significant drift.
+    """
+
+    expected = np.clip(expected / max(expected.sum(), 1), PROPORTION_EPSILON, None)
+    actual = np.clip(actual / max(actual.sum(), 1), PROPORTION_EPSILON, None)
+
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks_statistic(expected: np.ndarray, actual: np.ndarray) -> float:
+    """
+    Compute the Kolmogorov-Smirnov statistic between two binned distributions.
+
+    The statistic is the largest absolute gap between the two cumulative distributions evaluated
+    at the bin edges, so it is a lower bound of the exact (unbinned) KS statistic.
+
+    Args:
+        expected (np.ndarray): Bin counts of the baseline (training) distribution.
+        actual (np.ndarray): Bin counts of the observed (served) distribution.
+
+    Returns:
+        float: The KS statistic, between 0 and 1.
+    """
+
+    expected_cdf = np.cumsum(expected) / max(expected.sum(), 1)
+    actual_cdf = np.cumsum(actual) / max(actual.sum(), 1)
+
+    return float(np.max(np.abs(expected_cdf - actual_cdf)))
+
+
+def drift_status(psi: float) -> str:
+    """Map a PSI value to a human readable drift status."""
+
+    if psi >= PSI_SIGNIFICANT_DRIFT:
+        return "significant"
+
+    elif psi >= PSI_MODERATE_DRIFT:
+        return "moderate"
+
+    return "stable"
+
+
+
+class DriftMonitor:
+
+    def __init__(self, numerical_features: List[str], feature_min: Sequence[float], feature_max: Sequence[float],
+                 categorical_feature: str, categories: Sequence[str], n_bins: int = 10, buffer_size: int = 256,
+                 baseline: Optional[Dict] = None):
+        """
+        Initialize the DriftMonitor.
+
+        The monitor keeps constant-memory sketches of the served traffic:
+        - one fixed-bin histogram per numerical feature, with `n_bins` equal-width bins spanning the
+          fitted MinMaxScaler range plus one underflow and one overflow bin (receiving -inf and +inf),
+          and a count of missing (NaN) values, which are left out of the histogram.
+        - a count per category of the fitted OneHotEncoder vocabulary, plus one bucket for unknown categories.
+
+        Observations are appended to a small buffer as they are, and their feature values are only read when
+        the buffer is folded into the sketches with a single vectorized update, once it is full (or when a
+        report is requested). The per-request cost is therefore a single append.
+
+        Args:
+            numerical_features (List[str]): Names of the numerical features, in scaler order.
+            feature_min (Sequence[float]): Minimum value seen by the scaler for each numerical feature.
+            feature_max (Sequence[float]): Maximum value seen by the scaler for each numerical feature.
+            categorical_feature (str): Name of the categorical feature.
+            categories (Sequence[str]): The known categories of the encoder.
+            n_bins (int, optional): Number of equal-width bins inside the scaler range. Defaults to 10.
+            buffer_size (int, optional): Number of observations buffered before a batch update. Defaults to 256.
+            baseline (Optional[Dict], optional): Baseline sketches as returned by `fit_baseline`. Defaults to None.
+        """
+
+        self.numerical_features = list(numerical_features)
+        self.categorical_feature = categorical_feature
+        self.categories = [str(category) for category in categories]
+        self.n_bins = n_bins
+        self.buffer_size = buffer_size
+        self.baseline = baseline
+
+        self._feature_min = np.asarray(feature_min, dtype=float)
+        self._feature_max = np.asarray(feature_max, dtype=float)
+        feature_range = self._feature_max - self._feature_min
+
+        # Guard against constant features, which would otherwise divide by zero.
+        self._bin_scale = n_bins / np.where(feature_range > 0, feature_range, 1.0)
+
+        # Offsets that place each feature's bins in its own slice of one flat counts array.
+        self._offsets = np.arange(len(self.numerical_features)) * (n_bins + 2)
+        self._category_index = {category: index for index, category in enumerate(self.categories)}
+
+        self._numerical_counts = np.zeros((len(self.numerical_features), n_bins + 2), dtype=np.int64)
+        self._category_counts = np.zeros(len(self.categories) + 1, dtype=np.int64)
+        self._missing_counts = np.zeros(len(self.numerical_features), dtype=np.int64)
+
+        # Read the feature values of buffered observations, which expose them as attributes.
+        self._numerical_values = attrgetter(*self.numerical_features)
+        self._category_value = attrgetter(self.categorical_feature)
+
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+        # Serializes draining the buffer: concurrent flushes would otherwise pop more rows than are left.
+        self._drain_lock = threading.Lock()
+
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor, **kwargs) -> "DriftMonitor":
+        """
+        Build a DriftMonitor aligned with a fitted TastyModel preprocessor.
+
+        Args:
+            preprocessor (ColumnTransformer): The fitted ColumnTransformer with 'num' (MinMaxScaler)
+                and 'cat' (OneHotEncoder) transformers.
+            **kwargs: Extra keyword arguments forwarded to the DriftMonitor constructor.
+
+        Returns:
+            DriftMonitor: A monitor with empty sketches.
+        """
+
+        scaler = preprocessor.named_transformers_['num']
+        encoder = preprocessor.named_transformers_['cat']
+
+        columns = {name: list(columns) for name, _, columns in preprocessor.transformers_}
+
+        return cls(
+            numerical_features=columns['num'],
+            feature_min=scaler.data_min_,
+            feature_max=scaler.data_max_,
+            categorical_feature=columns['cat'][0],
+            categories=encoder.categories_[0],
+            **kwargs
+        )
+
+
+    @classmethod
+    def from_artifact(cls, filename: Union[Path, str], reference_data: Optional[Union[Path, str]] = None,
+                      **kwargs) -> "DriftMonitor":
+        """
+        Build a DriftMonitor from a saved TastyModel artifact.
+
+        The training baseline stored in the artifact is used when present. Artifacts saved before
+        baselines were recorded fall back to computing the baseline from `reference_data`, if given.
+
+        Args:
+            filename (Union[Path, str]): The file path of the saved model artifact.
+            reference_data (Optional[Union[Path, str]], optional): CSV file used to compute the baseline
+                when the artifact does not contain one. Defaults to None.
+            **kwargs: Extra keyword arguments forwarded to the DriftMonitor constructor.
+
+        Returns:
+            DriftMonitor: A monitor aligned with the artifact's preprocessor.
+        """
+
+        loaded_data = joblib.load(filename)
+        monitor = cls.from_preprocessor(loaded_data['preprocessor'], **kwargs)
+
+        if loaded_data.get('baseline') is not None:
+            monitor.baseline = loaded_data['baseline']
+
+        elif reference_data is not None and Path(reference_data).exists():
+            monitor.fit_baseline(pd.read_csv(reference_data))
+
+        return monitor
+
+
+    def _sketch(self, numerical: np.ndarray, category_codes: np.ndarray):
+        """Compute histogram, missing value and category counts for a batch of observations."""
+
+        n_slots = len(self.numerical_features) * (self.n_bins + 2)
+        missing = np.isnan(numerical)
+
+        # Clip before the integer cast, which would turn infinite and huge values into INT64_MIN.
+        # Bin index 0 is the underflow bin (including -inf) and n_bins + 1 the overflow bin (including +inf).
+        bins = np.floor(np.clip((numerical - self._feature_min) * self._bin_scale, -1, self.n_bins))
+        bins = np.where(missing, 0, bins).astype(np.int64) + 1
+
+        # Values exactly at the scaler maximum belong to the last regular bin, not to the overflow bin.
+        bins[numerical == self._feature_max] = self.n_bins
+
+        numerical_counts = np.bincount((bins + self._offsets)[~missing], minlength=n_slots)
+        category_counts = np.bincount(category_codes, minlength=len(self.categories) + 1)
+
+        return numerical_counts.reshape(len(self.numerical_features), -1), missing.sum(axis=0), category_counts
+
+
+    def _encode_categories(self, categories: Sequence[str]) -> np.ndarray:
+        """Map category labels to vocabulary indices, with unknown categories mapped to the last index."""
+
+        unknown = len(self.categories)
+
+        return np.fromiter((self._category_index.get(category, unknown) for category in categories),
+                           dtype=np.int64, count=len(categories))
+
+
+    def fit_baseline(self, df: pd.DataFrame) -> Dict:
+        """
+        Compute the baseline sketches from training data.
+
+        Args:
+            df (pd.DataFrame): DataFrame containing the numerical and categorical feature columns.
+
+        Returns:
+            Dict: The baseline, with 'numerical' histogram counts and 'categorical' counts.
+        """
+
+        numerical = df[self.numerical_features].to_numpy(dtype=float)
+        category_codes = self._encode_categories(df[self.categorical_feature].astype(str).tolist())
+
+        numerical_counts, _, category_counts = self._sketch(numerical, category_codes)
+        self.baseline = {'numerical': numerical_counts, 'categorical': category_counts}
+
+        return self.baseline
+
+
+    def observe(self, record):
+        """
+        Record a single served observation.
+
+        The observation is only buffered, unread; the sketches are updated in batches of `buffer_size`.
+
+        Args:
+            record: The observation, exposing every numerical feature and the categorical feature as
+                attributes (e.g. the request body of a prediction). It must not be modified afterwards.
+
+        Returns:
+            None
+        """
+
+        self._pending.append(record)
+
+        if len(self._pending) >= self.buffer_size:
+            self.flush()
+
+
+    def update_batch(self, numerical: np.ndarray, categories: Sequence[str]):
+        """
+        Fold a batch of observations into the sketches with one vectorized update.
+
+        Args:
+            numerical (np.ndarray): Array of shape (n_samples, n_numerical_features).
+            categories (Sequence[str]): Category of each observation.
+
+        Returns:
+            None
+        """
+
+        numerical = np.asarray(numerical, dtype=float).reshape(-1, len(self.numerical_features))
+
+        if len(numerical) == 0:
+            return
+
+        numerical_counts, missing_counts, category_counts = self._sketch(numerical, self._encode_categories(categories))
+
+        with self._lock:
+            self._numerical_counts += numerical_counts
+            self._missing_counts += missing_counts
+            self._category_counts += category_counts
+
+
+    def flush(self):
+        """Fold all buffered observations into the sketches."""
+
+        # Only one thread drains at a time, so the rows counted here are still in the buffer when popped.
+        # Observations appended concurrently are kept for the next flush.
+        with self._drain_lock:
+            rows = [self._pending.popleft() for _ in range(len(self._pending))]
+
+        if rows:
+            # fromiter over a flat chain avoids the per-row overhead of building a 2D array from nested lists.
+            values = map(self._numerical_values, rows)
+            if len(self.numerical_features) > 1:
+                values = chain.from_iterable(values)
+
+            numerical = np.fromiter(values, dtype=float, count=len(rows) * len(self.numerical_features))
+
+            self.update_batch(numerical, [self._category_value(row) for row in rows])
+
+
+    def reset(self):
+        """Discard all observations, keeping the baseline."""
+
+        self._pending.clear()
+
+        with self._lock:
+            self._numerical_counts[:] = 0
+            self._missing_counts[:] = 0
+            self._category_counts[:] = 0
+
+
+    def report(self) -> Dict:
+        """
+        Compare the served traffic against the training baseline.
+
+        Returns:
+            Dict: A report with the number of observations, the number of unknown categories and,
+                for every feature, its PSI, drift status and (for numerical features) binned KS statistic and
+                underflow, overflow and missing (NaN) counts.
+                Drift statistics are None when no baseline is available.
+        """
+
+        self.flush()
+
+        with self._lock:
+            numerical_counts = self._numerical_counts.copy()
+            missing_counts = self._missing_counts.copy()
+            category_counts = self._category_counts.copy()
+
+        has_baseline = self.baseline is not None and category_counts.sum() > 0
+        features = {}
+
+        for index, feature in enumerate(self.numerical_features):
+            psi = ks = None
+
+            if has_baseline:
+                expected = self.baseline['numerical'][index]
+                psi = population_stability_index(expected, numerical_counts[index])
+                ks = binned_ks_statistic(expected, numerical_counts[index])
+
+            features[feature] = {
+                "psi": psi,
+                "ks": ks,
+                "status": drift_status(psi) if psi is not None else None,
+                "underflow": int(numerical_counts[index, 0]),
+                "overflow": int(numerical_counts[index, -1]),
+                "missing": int(missing_counts[index]),
+            }
+
+        psi = population_stability_index(self.baseline['categorical'], category_counts) if has_baseline else None
+
+        features[self.categorical_feature] = {
+            "psi": psi,
+            "status": drift_status(psi) if psi is not None else None,
+            "counts": {category: int(count) for category, count in zip(self.categories, category_counts)},
+        }
+
+        return {
+            "observations": int(category_counts.sum()),
+            "unknown_categories": int(category_counts[-1]),
+            "baseline_available": self.baseline is not None,
+            "features": features,
+        }
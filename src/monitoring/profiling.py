@@ -0,0 +1,247 @@
+from typing import Dict, Union
+from contextlib import contextmanager, nullcontext
+from itertools import count
+from pathlib import Path
+import cProfile
+import threading
+import time
+import tracemalloc
+
+
+
+class StageProfiler:
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = True):
+        """
+        Initialize the StageProfiler.
+
+        The profiler records, per named stage, the number of calls, the wall time and the peak memory
+        allocated while the stage ran (via tracemalloc). When disabled, `stage` returns a shared no-op
+        context manager, so instrumented code pays nothing.
+
+        Args:
+            enabled (bool, optional): Whether stages are recorded. Defaults to False.
+            trace_memory (bool, optional): Whether to capture peak memory with tracemalloc. Tracing slows
+                down allocations, so disable it for timing-only runs. Defaults to True.
+
+        Usage:
+            >>> profiler = StageProfiler(enabled=True)
+            >>> with profiler.stage("fit"):
+            ...     model.fit(X, y)
+            >>> profiler.report()
+        """
+
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._noop = nullcontext()
+
+
+    def stage(self, name: str):
+        """
+        Return a context manager recording one call of the named stage.
+
+        Args:
+            name (str): The stage name, e.g. "preprocess" or "fit".
+
+        Returns:
+            ContextManager: The recording context manager, or a no-op one when disabled.
+        """
+
+        if not self.enabled:
+            return self._noop
+
+        return self._record(name)
+
+
+    @contextmanager
+    def _record(self, name: str):
+        """Time a stage and capture its peak traced memory."""
+
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+
+            tracemalloc.reset_peak()
+            start_memory, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            elapsed = time.perf_counter() - start
+
+            peak_memory = None
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                peak_memory = max(peak - start_memory, 0)
+
+                if started_tracing:
+                    tracemalloc.stop()
+
+            stats = self.stages.setdefault(name, {"calls": 0, "total_seconds": 0.0, "peak_memory_bytes": None})
+            stats["calls"] += 1
+            stats["total_seconds"] += elapsed
+
+            if peak_memory is not None:
+                stats["peak_memory_bytes"] = max(stats["peak_memory_bytes"] or 0, peak_memory)
+
+
+    def report(self) -> Dict[str, Dict]:
+        """
+        Return the recorded stages.
+
+        Returns:
+            Dict[str, Dict]: Per stage, in first-call order: calls, total and mean wall time in seconds,
+                and the largest peak memory in bytes (None when memory is not traced).
+        """
+
+        return {
+            name: {**stats, "mean_seconds": stats["total_seconds"] / stats["calls"]}
+            for name, stats in self.stages.items()
+        }
+
+
+    def reset(self):
+        """Discard all recorded stages."""
+
+        self.stages = {}
+
+
+
+class SampledProfiler:
+
+    def __init__(self, sample_rate: int, output_dir: Union[Path, str], allow_requested: bool = False,
+                 max_dumps: int = 100):
+        """
+        Initialize the SampledProfiler.
+
+        Runs cProfile around 1 in every `sample_rate` requests, and, when `allow_requested` is set, around
+        any request explicitly asking for it, and dumps each profile as a `.pstats` file readable with
+        `pstats` or snakeviz. Only the `max_dumps` most recent dumps are kept, so profiling cannot fill the disk.
+
+        cProfile only traces the thread it is enabled in. Around an async request that is the event loop
+        thread, so work the handler offloads to other threads (e.g. with `asyncio.to_thread`) is missing,
+        while coroutines of other requests interleaving with it on the loop may appear in the dump.
+
+        Args:
+            sample_rate (int): Profile one request in every `sample_rate`. 0 disables sampling.
+            output_dir (Union[Path, str]): Directory the `.pstats` files are written to. Created on the first dump.
+            allow_requested (bool, optional): Whether requests may ask to be profiled. Any client can then trigger
+                a profile, so only enable it where clients are trusted. Defaults to False.
+            max_dumps (int, optional): Number of most recent `.pstats` files kept in `output_dir`. Defaults to 100.
+        """
+
+        self.sample_rate = sample_rate
+        self.output_dir = Path(output_dir)
+        self.allow_requested = allow_requested
+        self.max_dumps = max_dumps
+
+        self._requests = count(1)
+
+        # Only one cProfile profiler can be active per thread, so concurrent requests are not profiled.
+        self._lock = threading.Lock()
+
+
+    def should_profile(self, requested: bool = False) -> bool:
+        """
+        Decide whether the current request is profiled.
+
+        Args:
+            requested (bool, optional): Whether the request explicitly asked to be profiled. Defaults to False.
+
+        Returns:
+            bool: True for requested profiles when allowed, and for every `sample_rate`-th request.
+        """
+
+        sampled = self.sample_rate > 0 and next(self._requests) % self.sample_rate == 0
+
+        return (requested and self.allow_requested) or sampled
+
+
+    @contextmanager
+    def profile(self, name: str):
+        """
+        Profile the enclosed block and dump it to `<output_dir>/<timestamp>-<counter>-<name>.pstats`.
+
+        The block runs unprofiled if another profile is already in progress. Once written, the oldest dumps
+        beyond `max_dumps` are deleted.
+
+        Args:
+            name (str): Name used in the dump file name, e.g. the request path.
+
+        Yields:
+            Optional[Path]: The path the profile will be written to, or None if it is not profiled.
+        """
+
+        if not self._lock.acquire(blocking=False):
+            yield None
+            return
+
+        filename = self.output_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{time.perf_counter_ns()}-{name}.pstats"
+        profiler = cProfile.Profile()
+
+        try:
+            profiler.enable()
+            yield filename
+
+        finally:
+            profiler.disable()
+            self._lock.release()
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(filename)
+            self._discard_old_dumps()
+
+
+    def _discard_old_dumps(self):
+        """Delete the oldest `.pstats` files of the output directory beyond `max_dumps`."""
+
+        dumps = sorted(self.output_dir.glob("*.pstats"), key=lambda path: path.stat().st_mtime_ns)
+
+        for path in dumps[:max(len(dumps) - self.max_dumps, 0)]:
+            path.unlink(missing_ok=True)
+
+
+
+class ProfilingMiddleware:
+
+    def __init__(self, app, profiler: SampledProfiler, header: str = "x-profile"):
+        """
+        Initialize the ProfilingMiddleware.
+
+        A plain ASGI middleware running a SampledProfiler around sampled HTTP requests and, if the profiler
+        allows requested profiles, around requests sent with the profiling header set to "1" or "true".
+        Otherwise the header is not even looked up.
+
+        Args:
+            app: The ASGI application to wrap.
+            profiler (SampledProfiler): The profiler deciding which requests are profiled.
+            header (str, optional): Name of the request header asking for a profile. Defaults to "x-profile".
+        """
+
+        self.app = app
+        self.profiler = profiler
+        self.header = header.lower().encode()
+
+
+    async def __call__(self, scope, receive, send):
+        """Profile the request if it is sampled or asks for it, then pass it on to the application."""
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = self.profiler.allow_requested and any(
+            name == self.header and value.lower() in (b"1", b"true") for name, value in scope["headers"]
+        )
+
+        if not self.profiler.should_profile(requested):
+            await self.app(scope, receive, send)
+            return
+
+        with self.profiler.profile(scope["path"].strip("/").replace("/", "_") or "root"):
+            await self.app(scope, receive, send)